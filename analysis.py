@@ -0,0 +1,61 @@
+"""UI-free launch analysis: fetch a location's date windows and score them for an activity
+
+Everything here takes plain arguments and reports progress through an
+optional `progress_callback(done, total, label)`, so the same code runs from
+the Streamlit app, batch jobs, worker processes and benchmarks.
+"""
+from fetch_report import FetchReport
+from nasa_power import (MAX_CONCURRENT_REQUESTS, analysis_years, extract_date_windows, load_location_history,
+                        snap_to_grid, sync_location_history)
+from risk_scoring import calculate_confidence_score, calculate_enhanced_weather_risks
+
+def fetch_analysis_windows(lat, lon, target_month, target_day, store, years_back=15,
+                           max_workers=MAX_CONCURRENT_REQUESTS, progress_callback=None, load_history=None):
+    """Sync a cell's stored history and slice out the target date windows
+
+    Returns (windows, diagnostics), see FetchReport.diagnostics.
+    `load_history(lat, lon, years_back, version)` can replace the plain store
+    read, e.g. with an in-memory cache keyed on the store version.
+    """
+    lat, lon = snap_to_grid(lat, lon)
+    report = FetchReport()
+    version = sync_location_history(lat, lon, store, years_back=years_back, max_workers=max_workers,
+                                    progress_callback=progress_callback, report=report)
+    if load_history is None:
+        history = load_location_history(lat, lon, store, years_back=years_back)
+    else:
+        history = load_history(lat, lon, years_back, version)
+    report.log(f"{lat:.3f},{lon:.3f}")
+
+    windows = extract_date_windows(history, target_month, target_day, years_back)
+    return windows, report.diagnostics(windows, analysis_years(years_back), target_month, target_day)
+
+def score_windows(windows, target_month, target_day, thresholds):
+    """Risks, overall risk, stats, filtered days and confidence for one set of thresholds
+
+    Every value is None when there is too little data to score.
+    """
+    scored = {'risks': None, 'overall_risk': None, 'stats': None, 'df_filtered': None, 'confidence': None}
+    result = None
+    if not windows.empty:
+        result = calculate_enhanced_weather_risks(windows, target_month, target_day, thresholds)
+    if result is not None:
+        risks, overall_risk, stats, df_filtered = result
+        scored.update(risks=risks, overall_risk=overall_risk, stats=stats, df_filtered=df_filtered,
+                      confidence=calculate_confidence_score(stats)[0])
+    return scored
+
+def run_analysis(lat, lon, target_date, thresholds, store, years_back=15, max_workers=MAX_CONCURRENT_REQUESTS,
+                 progress_callback=None, load_history=None):
+    """Full launch analysis for one location, date and set of activity thresholds
+
+    Returns a dict with 'grid_cell', 'windows' and 'diagnostics' plus the
+    score_windows keys.
+    """
+    grid_cell = snap_to_grid(lat, lon)
+    windows, diagnostics = fetch_analysis_windows(*grid_cell, target_date.month, target_date.day, store,
+                                                  years_back=years_back, max_workers=max_workers,
+                                                  progress_callback=progress_callback, load_history=load_history)
+    analysis = {'grid_cell': grid_cell, 'windows': windows, 'diagnostics': diagnostics}
+    analysis.update(score_windows(windows, target_date.month, target_date.day, thresholds))
+    return analysis
@@ -0,0 +1,305 @@
+"""JSON HTTP API serving the launch risk analysis, alongside the Streamlit UI
+
+Usage: python api_server.py --host 0.0.0.0 --port 8000 [--years-back 15]
+       python api_server.py --check  (checks that bad requests are rejected with a 400)
+Needs starlette and uvicorn from requirements-extras.txt.
+
+    GET  /v1/risk?location=Toronto&date=2026-07-01&activity=Beach Day
+    GET  /v1/risk?lat=43.65&lon=-79.38&date=2026-07-01&temp_min=10&temp_max=30&rain=2&wind=12
+    POST /v1/risk  with the same fields as a JSON object
+    GET  /v1/activities
+    GET  /health
+
+Responses carry the same risks, overall_risk and stats as
+calculate_enhanced_weather_risks, plus the calculate_confidence_score label.
+Grid cell histories are kept in memory and shared by every request.
+Concurrent requests for a cell that is not loaded yet wait on a single sync
+instead of each starting their own. Blocking store and scoring work runs on
+a thread pool so the event loop keeps accepting requests.
+"""
+import argparse
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from analysis import score_windows
+from history_store import HISTORY_DB_PATH, HistoryStore
+from nasa_power import extract_date_windows, load_location_history, snap_to_grid, sync_location_history
+from presets import ACTIVITY_PROFILES, find_activity, find_location
+
+HISTORY_CACHE_CELLS = 256  # Grid cell histories kept in memory, least recently used evicted first
+RESULT_CACHE_ENTRIES = 4096  # Scored (cell, date, thresholds) results kept in memory
+HISTORY_REFRESH_SECONDS = 15 * 60  # How long a cached history is served before the store is synced again
+WORKER_THREADS = 8  # Threads for store syncs and scoring
+THRESHOLD_KEYS = ['temp_min', 'temp_max', 'rain', 'wind']
+
+logger = logging.getLogger("parade_guards.fetch")
+
+class RequestError(ValueError):
+    """Invalid request parameters, answered with HTTP 400"""
+
+def _json_safe(value):
+    """Plain Python numbers for numpy scalars, None for NaN and infinities"""
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, (float, np.floating)):
+        return float(value) if np.isfinite(value) else None
+    return value
+
+class HistoryCache:
+    """Per-cell location histories shared across requests, with concurrent misses coalesced
+
+    A history is served from memory for `refresh_seconds`, after which the
+    next request syncs the store again (only the missing or provisional tail
+    is downloaded). While a cell is being loaded every other request for it
+    awaits the same task.
+    """
+
+    def __init__(self, store, executor, years_back=15, max_cells=HISTORY_CACHE_CELLS,
+                 refresh_seconds=HISTORY_REFRESH_SECONDS):
+        self.store = store
+        self.executor = executor
+        self.years_back = years_back
+        self.max_cells = max_cells
+        self.refresh_seconds = refresh_seconds
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0}
+        self._entries = OrderedDict()
+        self._inflight = {}
+
+    def _sync_and_load(self, cell):
+        try:
+            sync_location_history(*cell, self.store, years_back=self.years_back)
+        except Exception as e:
+            # Serve whatever the store already holds
+            logger.warning("sync %.4f,%.4f failed, serving stored history: %s", cell[0], cell[1], e, exc_info=True)
+        return load_location_history(*cell, self.store, years_back=self.years_back)
+
+    async def _load(self, cell):
+        loop = asyncio.get_running_loop()
+        history = await loop.run_in_executor(self.executor, self._sync_and_load, cell)
+        if not history.empty:
+            self._entries[cell] = (time.monotonic(), history)
+            self._entries.move_to_end(cell)
+            while len(self._entries) > self.max_cells:
+                self._entries.popitem(last=False)
+        return history
+
+    async def get(self, cell):
+        """(loaded_at, history) for a grid cell"""
+        entry = self._entries.get(cell)
+        if entry is not None and time.monotonic() - entry[0] < self.refresh_seconds:
+            self._entries.move_to_end(cell)
+            self.stats['hits'] += 1
+            return entry
+
+        task = self._inflight.get(cell)
+        if task is None:
+            self.stats['misses'] += 1
+            task = asyncio.ensure_future(self._load(cell))
+            self._inflight[cell] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cell, None))
+        else:
+            self.stats['coalesced'] += 1
+        # Shielded so one cancelled request does not cancel the load for everyone else
+        history = await asyncio.shield(task)
+        return self._entries.get(cell, (None, history))
+
+class RiskService:
+    """Scores requests against the shared history cache, memoizing recent results"""
+
+    def __init__(self, store, years_back=15, threads=WORKER_THREADS):
+        self.years_back = years_back
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.histories = HistoryCache(store, self.executor, years_back=years_back)
+        self._results = OrderedDict()
+
+    def _score(self, history, target_month, target_day, thresholds):
+        windows = extract_date_windows(history, target_month, target_day, self.years_back)
+        scored = score_windows(windows, target_month, target_day, thresholds)
+        scored.pop('df_filtered')
+        return scored
+
+    async def analyze(self, cell, target_date, thresholds):
+        loaded_at, history = await self.histories.get(cell)
+        if history.empty:
+            return None
+
+        # loaded_at changes whenever the history is refreshed, which retires older results
+        key = (cell, target_date.month, target_date.day, tuple(thresholds[k] for k in THRESHOLD_KEYS), loaded_at)
+        scored = self._results.get(key)
+        if scored is None:
+            loop = asyncio.get_running_loop()
+            scored = await loop.run_in_executor(self.executor, self._score, history, target_date.month,
+                                                target_date.day, thresholds)
+            self._results[key] = scored
+            while len(self._results) > RESULT_CACHE_ENTRIES:
+                self._results.popitem(last=False)
+        return scored
+
+def parse_date(value):
+    """Midnight of a YYYY-MM-DD string, RequestError for anything else (numbers, "now", "NaT")"""
+    if not isinstance(value, str) or not value:
+        raise RequestError("Pass a date as YYYY-MM-DD")
+    try:
+        return datetime.combine(date.fromisoformat(value), datetime.min.time())
+    except ValueError:
+        raise RequestError(f"Invalid date {value!r}, pass YYYY-MM-DD") from None
+
+def parse_request(params):
+    """(label, grid cell, target date, activity or None, thresholds) from query or body fields"""
+    if params.get('location'):
+        label = str(params['location'])
+        lat, lon = find_location(label)
+    elif params.get('lat') is not None and params.get('lon') is not None:
+        lat, lon = float(params['lat']), float(params['lon'])
+        label = f"{lat:.4f}, {lon:.4f}"
+    else:
+        raise RequestError("Pass a location name or lat and lon")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise RequestError("Coordinates out of range")
+
+    target_date = parse_date(params.get('date'))
+
+    activity = None
+    if params.get('activity'):
+        activity = find_activity(str(params['activity']))
+        thresholds = dict(ACTIVITY_PROFILES[activity]['thresholds'])
+    else:
+        thresholds = dict(ACTIVITY_PROFILES["General Outdoor 🌳"]['thresholds'])
+    # Explicit thresholds override the activity's
+    for key in THRESHOLD_KEYS:
+        if params.get(key) is not None:
+            thresholds[key] = float(params[key])
+            if not math.isfinite(thresholds[key]):
+                raise RequestError(f"{key} must be a finite number")
+
+    return label, snap_to_grid(lat, lon), target_date, activity, thresholds
+
+# Requests parse_request must answer with a 400
+INVALID_REQUESTS = [
+    {'date': "2026-07-01"},
+    {'lat': "91", 'lon': "10", 'date': "2026-07-01"},
+    {'lat': "10", 'lon': "-181", 'date': "2026-07-01"},
+    {'lat': "nan", 'lon': "10", 'date': "2026-07-01"},
+    {'lat': "10", 'lon': "10", 'date': "2026-07-01", 'rain': "nan"},
+    {'lat': "10", 'lon': "10", 'date': "2026-07-01", 'wind': "inf"},
+    {'lat': "10", 'lon': "10", 'date': "2026-07-01", 'temp_min': "-inf"},
+    {'lat': "10", 'lon': "10", 'date': "2026-07-01", 'temp_max': "warm"},
+    {'lat': "10", 'lon': "10"},
+    {'lat': "10", 'lon': "10", 'date': ""},
+    {'lat': "10", 'lon': "10", 'date': "NaT"},
+    {'lat': "10", 'lon': "10", 'date': "now"},
+    {'lat': "10", 'lon': "10", 'date': "2026-02-30"},
+    {'lat': "10", 'lon': "10", 'date': "07/01/2026"},
+    {'lat': 10, 'lon': 10, 'date': 20260701},
+    {'lat': 10, 'lon': 10, 'date': None},
+]
+
+def check_request_validation():
+    """Run INVALID_REQUESTS and one valid request through parse_request"""
+    for params in INVALID_REQUESTS:
+        try:
+            parse_request(params)
+        except (ValueError, TypeError) as e:
+            print(f"rejected  {params}: {e}")
+        else:
+            raise AssertionError(f"accepted invalid request {params}")
+    label, cell, target_date, _, thresholds = parse_request({'lat': 10, 'lon': 10, 'date': "2026-07-01", 'rain': "2"})
+    if target_date != datetime(2026, 7, 1) or thresholds['rain'] != 2.0:
+        raise AssertionError(f"valid request parsed as {target_date}, {thresholds}")
+    print(f"accepted  {label} -> {cell}, {target_date:%Y-%m-%d}")
+
+def create_app(store=None, years_back=15, threads=WORKER_THREADS):
+    """Starlette app serving the risk API, with one shared RiskService"""
+    service = RiskService(store or HistoryStore(), years_back=years_back, threads=threads)
+
+    async def risk(request):
+        if request.method == "POST":
+            try:
+                params = await request.json()
+            except ValueError:
+                return JSONResponse({'error': "Body must be a JSON object"}, status_code=400)
+            if not isinstance(params, dict):
+                return JSONResponse({'error': "Body must be a JSON object"}, status_code=400)
+        else:
+            params = dict(request.query_params)
+
+        try:
+            label, cell, target_date, activity, thresholds = parse_request(params)
+        except (ValueError, TypeError) as e:
+            return JSONResponse({'error': str(e)}, status_code=400)
+
+        scored = await service.analyze(cell, target_date, thresholds)
+        body = {
+            'location': label,
+            'grid_cell': list(cell),
+            'date': target_date.strftime("%Y-%m-%d"),
+            'activity': activity,
+            'thresholds': _json_safe(thresholds)
+        }
+        if scored is None:
+            return JSONResponse({**body, 'error': "No NASA POWER data available for this location"},
+                                status_code=503)
+        if scored['risks'] is None:
+            return JSONResponse({**body, 'error': "Insufficient historical data for this date"}, status_code=422)
+
+        body.update(risks=_json_safe(scored['risks']), overall_risk=_json_safe(scored['overall_risk']),
+                    stats=_json_safe(scored['stats']), confidence=scored['confidence'])
+        return JSONResponse(body)
+
+    async def activities(request):
+        return JSONResponse({
+            name: {'thresholds': profile['thresholds'], 'description': profile['description']}
+            for name, profile in ACTIVITY_PROFILES.items()
+        })
+
+    async def health(request):
+        return JSONResponse({'status': "ok", 'cached_cells': len(service.histories._entries),
+                             'history_cache': service.histories.stats})
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        service.executor.shutdown(wait=False)
+
+    app = Starlette(routes=[
+        Route("/v1/risk", risk, methods=["GET", "POST"]),
+        Route("/v1/activities", activities),
+        Route("/health", health),
+    ], lifespan=lifespan)
+    app.state.service = service
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the weather risk analysis as a JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--years-back", type=int, default=15)
+    parser.add_argument("--threads", type=int, default=WORKER_THREADS)
+    parser.add_argument("--store", default=HISTORY_DB_PATH, help="History store shared with the app")
+    parser.add_argument("--check", action="store_true", help="Check request validation and exit")
+    args = parser.parse_args()
+    if args.check:
+        check_request_validation()
+        return
+
+    import uvicorn
+
+
+    app = create_app(HistoryStore(args.store), years_back=args.years_back, threads=args.threads)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+
+if __name__ == "__main__":
+    main()
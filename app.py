@@ -1,9 +1,10 @@
 import streamlit as st
-import requests
 import pandas as pd
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
-import numpy as np
+from nasa_power import fetch_weather_history
+from risk_scoring import calculate_enhanced_weather_risks
+from streamlit_progress import streamlit_progress
 
 # Page config - MUST be first
 st.set_page_config(
@@ -352,128 +353,15 @@ ACTIVITY_PROFILES = {
 # -----------------------------
 @st.cache_data(ttl=7200, show_spinner=False)
 def fetch_historical_weather(lat, lon, target_month, target_day, years_back=15):
-    """Fetch historical weather data"""
-    all_data = []
-    current_year = datetime.now().year
-    start_year = max(1981, current_year - years_back)
-    
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    successful_years = 0
-    
-    for idx, year in enumerate(range(start_year, current_year)):
-        try:
-            status_text.text(f"📡 Fetching data: {year} ({idx+1}/{current_year-start_year})")
-            
-            try:
-                center_date = datetime(year, target_month, target_day)
-            except ValueError:
-                if target_month == 2 and target_day == 29:
-                    center_date = datetime(year, 2, 28)
-                else:
-                    continue
-            
-            start_date = center_date - timedelta(days=5)
-            end_date = center_date + timedelta(days=5)
-            
-            start_str = start_date.strftime("%Y%m%d")
-            end_str = end_date.strftime("%Y%m%d")
-            
-            url = (f"https://power.larc.nasa.gov/api/temporal/daily/point?"
-                   f"parameters=T2M,T2M_MAX,T2M_MIN,PRECTOTCORR,WS2M&"
-                   f"community=RE&longitude={lon}&latitude={lat}&"
-                   f"start={start_str}&end={end_str}&format=JSON")
-            
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            
-            if 'properties' not in data or 'parameter' not in data['properties']:
-                continue
-            
-            parameters = data['properties']['parameter']
-            
-            for date_str in parameters['T2M'].keys():
-                date_obj = datetime.strptime(date_str, "%Y%m%d")
-                
-                temp = parameters['T2M'][date_str]
-                temp_max = parameters['T2M_MAX'][date_str]
-                temp_min = parameters['T2M_MIN'][date_str]
-                precip = parameters['PRECTOTCORR'][date_str]
-                wind = parameters['WS2M'][date_str]
-                
-                if all(v not in [None, -999, -999.0] for v in [temp, temp_max, temp_min, precip, wind]):
-                    all_data.append({
-                        'year': year,
-                        'date': date_obj,
-                        'month': date_obj.month,
-                        'day': date_obj.day,
-                        'temperature': float(temp),
-                        'temp_max': float(temp_max),
-                        'temp_min': float(temp_min),
-                        'precipitation': float(precip),
-                        'wind_speed': float(wind)
-                    })
-            
-            successful_years += 1
-            progress_bar.progress((idx + 1) / (current_year - start_year))
-            
-        except:
-            pass
-    
-    progress_bar.empty()
-    status_text.empty()
+    """Fetch historical weather data, requesting per-year windows in parallel"""
+    with streamlit_progress() as on_progress:
+        df = fetch_weather_history(lat, lon, target_month, target_day, years_back=years_back,
+                                   progress_callback=on_progress)
     
+    successful_years = df['year'].nunique() if not df.empty else 0
     if successful_years < 5:
         st.warning(f"⚠️ Only {successful_years} years of data retrieved. Results may be less reliable.")
-    
-    return pd.DataFrame(all_data)
-
-def calculate_weather_risks(df, target_month, target_day, thresholds):
-    """Calculate weather risk probabilities"""
-    df_filtered = df[
-        (df['month'] == target_month) & 
-        (abs(df['day'] - target_day) <= 3)
-    ].copy()
-    
-    if len(df_filtered) < 10:
-        return None
-    
-    total_days = len(df_filtered)
-    
-    risks = {
-        'too_cold': (df_filtered['temp_min'] < thresholds['temp_min']).sum() / total_days * 100,
-        'too_hot': (df_filtered['temp_max'] > thresholds['temp_max']).sum() / total_days * 100,
-        'rainy': (df_filtered['precipitation'] >= thresholds['rain']).sum() / total_days * 100,
-        'windy': (df_filtered['wind_speed'] >= thresholds['wind']).sum() / total_days * 100
-    }
-    
-    bad_weather_days = (
-        (df_filtered['temp_min'] < thresholds['temp_min']) |
-        (df_filtered['temp_max'] > thresholds['temp_max']) |
-        (df_filtered['precipitation'] >= thresholds['rain']) |
-        (df_filtered['wind_speed'] >= thresholds['wind'])
-    ).sum()
-    
-    overall_risk = (bad_weather_days / total_days) * 100
-    
-    stats = {
-        'avg_temp': df_filtered['temperature'].mean(),
-        'typical_high': df_filtered['temp_max'].median(),
-        'typical_low': df_filtered['temp_min'].median(),
-        'max_temp_ever': df_filtered['temp_max'].max(),
-        'min_temp_ever': df_filtered['temp_min'].min(),
-        'avg_precip': df_filtered['precipitation'].mean(),
-        'max_precip_ever': df_filtered['precipitation'].max(),
-        'avg_wind': df_filtered['wind_speed'].mean(),
-        'max_wind_ever': df_filtered['wind_speed'].max(),
-        'rainy_days': (df_filtered['precipitation'] >= 1.0).sum(),
-        'total_days': total_days,
-        'years_analyzed': df_filtered['year'].nunique()
-    }
-    
-    return risks, overall_risk, stats, df_filtered
+    return df
 
 def create_risk_gauge(overall_risk):
     """Create gauge chart"""
@@ -667,7 +555,7 @@ if st.button("🔍 **ANALYZE WEATHER RISK**", type="primary", use_container_widt
     if df.empty:
         st.error("❌ Unable to retrieve weather data. Please try a different location or check your internet connection.")
     else:
-        result = calculate_weather_risks(df, target_date.month, target_date.day, activity_info['thresholds'])
+        result = calculate_enhanced_weather_risks(df, target_date.month, target_date.day, activity_info['thresholds'])
         
         if result is None:
             st.error("❌ Insufficient historical data for this date. Try a different date.")
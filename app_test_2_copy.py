@@ -1,28 +1,19 @@
 import streamlit as st
-import requests
 import pandas as pd
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
 import numpy as np
+from charts import create_temperature_distribution
+from nasa_power import fetch_weather_history
+from data_export import prepare_data_with_metadata
+from risk_scoring import calculate_enhanced_weather_risks
+from share_image import render_share_image
+from streamlit_progress import streamlit_progress
+from static_assets import logo_src
 import os
-import base64
-from PIL import Image
 import io
-import plotly.io as pio
 # Add after existing imports
 from datetime import datetime, timedelta
-import requests
-import json
-
-def fetch_additional_data(lat, lon, start_date, end_date):
-    """Fetch additional data from GES DISC OPeNDAP"""
-    try:
-        # GES DISC API endpoint
-        ges_disc_url = f"https://disc.gsfc.nasa.gov/api/search?lat={lat}&lon={lon}&startTime={start_date}&endTime={end_date}"
-        response = requests.get(ges_disc_url)
-        return response.json()
-    except:
-        return None
 
 # Page config - MUST be first
 st.set_page_config(
@@ -457,107 +448,11 @@ ACTIVITY_PROFILES = {
 # -----------------------------
 @st.cache_data(ttl=7200, show_spinner=False)
 def fetch_historical_weather(lat, lon, target_month, target_day, years_back=15):
-    all_data = []
-    current_year = datetime.now().year
-    start_year = max(1981, current_year - years_back)
-    
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    successful_years = 0
-    
-    for idx, year in enumerate(range(start_year, current_year)):
-        try:
-            status_text.text(f"📡 Fetching data: {year} ({idx+1}/{current_year-start_year})")
-            
-            try:
-                center_date = datetime(year, target_month, target_day)
-            except ValueError:
-                if target_month == 2 and target_day == 29:
-                    center_date = datetime(year, 2, 28)
-                else:
-                    continue
-            
-            start_date = center_date - timedelta(days=5)
-            end_date = center_date + timedelta(days=5)
-            
-            url = (f"https://power.larc.nasa.gov/api/temporal/daily/point?"
-                   f"parameters=T2M,T2M_MAX,T2M_MIN,PRECTOTCORR,WS2M&"
-                   f"community=RE&longitude={lon}&latitude={lat}&"
-                   f"start={start_date.strftime('%Y%m%d')}&end={end_date.strftime('%Y%m%d')}&format=JSON")
-            
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            
-            if 'properties' not in data or 'parameter' not in data['properties']:
-                continue
-            
-            parameters = data['properties']['parameter']
-            
-            for date_str in parameters['T2M'].keys():
-                date_obj = datetime.strptime(date_str, "%Y%m%d")
-                temp = parameters['T2M'][date_str]
-                temp_max = parameters['T2M_MAX'][date_str]
-                temp_min = parameters['T2M_MIN'][date_str]
-                precip = parameters['PRECTOTCORR'][date_str]
-                wind = parameters['WS2M'][date_str]
-                
-                if all(v not in [None, -999, -999.0] for v in [temp, temp_max, temp_min, precip, wind]):
-                    all_data.append({
-                        'year': year, 'date': date_obj, 'month': date_obj.month, 'day': date_obj.day,
-                        'temperature': float(temp), 'temp_max': float(temp_max), 'temp_min': float(temp_min),
-                        'precipitation': float(precip), 'wind_speed': float(wind)
-                    })
-            
-            successful_years += 1
-            progress_bar.progress((idx + 1) / (current_year - start_year))
-        except:
-            pass
-    
-    progress_bar.empty()
-    status_text.empty()
-    return pd.DataFrame(all_data)
-
-def calculate_weather_risks(df, target_month, target_day, thresholds):
-    df_filtered = df[(df['month'] == target_month) & (abs(df['day'] - target_day) <= 3)].copy()
-    
-    if len(df_filtered) < 10:
-        return None
-    
-    total_days = len(df_filtered)
-    
-    risks = {
-        'too_cold': (df_filtered['temp_min'] < thresholds['temp_min']).sum() / total_days * 100,
-        'too_hot': (df_filtered['temp_max'] > thresholds['temp_max']).sum() / total_days * 100,
-        'rainy': (df_filtered['precipitation'] >= thresholds['rain']).sum() / total_days * 100,
-        'windy': (df_filtered['wind_speed'] >= thresholds['wind']).sum() / total_days * 100
-    }
-    
-    bad_weather_days = (
-        (df_filtered['temp_min'] < thresholds['temp_min']) |
-        (df_filtered['temp_max'] > thresholds['temp_max']) |
-        (df_filtered['precipitation'] >= thresholds['rain']) |
-        (df_filtered['wind_speed'] >= thresholds['wind'])
-    ).sum()
-    
-    overall_risk = (bad_weather_days / total_days) * 100
-    
-    stats = {
-        'avg_temp': df_filtered['temperature'].mean(),
-        'typical_high': df_filtered['temp_max'].median(),
-        'typical_low': df_filtered['temp_min'].median(),
-        'max_temp_ever': df_filtered['temp_max'].max(),
-        'min_temp_ever': df_filtered['temp_min'].min(),
-        'avg_precip': df_filtered['precipitation'].mean(),
-        'max_precip_ever': df_filtered['precipitation'].max(),
-        'avg_wind': df_filtered['wind_speed'].mean(),
-        'max_wind_ever': df_filtered['wind_speed'].max(),
-        'rainy_days': (df_filtered['precipitation'] >= 1.0).sum(),
-        'total_days': total_days,
-        'years_analyzed': df_filtered['year'].nunique()
-    }
-    
-    return risks, overall_risk, stats, df_filtered
+    """Fetch historical weather data, requesting per-year windows in parallel"""
+    with streamlit_progress() as on_progress:
+        df = fetch_weather_history(lat, lon, target_month, target_day, years_back=years_back,
+                                   progress_callback=on_progress)
+    return df
 
 def create_risk_gauge(overall_risk):
     if overall_risk < 20:
@@ -631,170 +526,19 @@ def create_weather_trend(df_filtered):
         font={'color': "#ffffff"}
     )
     return fig
-def calculate_confidence_score(stats):
-    years = stats['years_analyzed']
-    days = stats['total_days']
-    
-    if years >= 10 and days >= 50:
-        return "HIGH ✅", "#00ff64"
-    elif years >= 5 and days >= 25:
-        return "MEDIUM ⚠️", "#ffa500"
-    else:
-        return "LOW ❌", "#ff0080"
-    
-def prepare_data_with_metadata(df, location, date):
-    """Add metadata to downloaded data"""
-    metadata = {
-        "data_source": "NASA POWER API",
-        "location": location,
-        "coordinates": f"Lat: {latitude}, Lon: {longitude}",
-        "date_generated": datetime.now().strftime("%Y-%m-%d"),
-        "units": {
-            "temperature": "Celsius",
-            "precipitation": "mm",
-            "wind_speed": "m/s"
-        },
-        "data_variables": list(df.columns),
-        "analysis_date": date.strftime("%Y-%m-%d")
-    }
-    
-    if format_choice == "JSON":
-        data = {
-            "metadata": metadata,
-            "data": json.loads(df.to_json(orient="records"))
-        }
-        return json.dumps(data)
-    else:
-        metadata_str = "\n".join([f"# {k}: {v}" for k, v in metadata.items()])
-        return f"{metadata_str}\n\n{df.to_csv(index=False)}"
-
 def create_shareable_image(location_name, target_date, selected_activity, overall_risk, stats, risks):
     """Create a shareable image with analysis results"""
     try:
-        # Create the gauge plot
-        gauge_fig = create_risk_gauge(overall_risk)
-        gauge_img = pio.to_image(gauge_fig, format="png")
-        
-        # Create combined figure for sharing
-        share_fig = go.Figure()
-        
-        # Layout with custom styling
-        share_fig.update_layout(
-            title={
-                'text': "PARADE GUARDS: Weather Intelligence Report",
-                'y':0.95,
-                'x':0.5,
-                'xanchor': 'center',
-                'yanchor': 'top',
-                'font': {'size': 24, 'color': '#00d4ff', 'family': "Orbitron"}
-            },
-            paper_bgcolor="rgba(0,0,0,0.9)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            font={'color': "#ffffff", 'family': "Exo 2"},
-            height=800,
-            showlegend=False,
-            annotations=[
-                # Location and Date
-                dict(
-                    text=f"📍 {location_name}<br>📅 {target_date.strftime('%B %d, %Y')}",
-                    x=0.5, y=0.85,
-                    showarrow=False,
-                    font={'size': 18, 'color': '#ffffff'}
-                ),
-                # Activity
-                dict(
-                    text=f"Activity: {selected_activity}",
-                    x=0.5, y=0.80,
-                    showarrow=False,
-                    font={'size': 16, 'color': '#00ff64'}
-                ),
-                # Risk Score
-                dict(
-                    text=f"Risk Score: {overall_risk:.1f}%",
-                    x=0.5, y=0.75,
-                    showarrow=False,
-                    font={'size': 20, 'color': '#ff0080'}
-                ),
-                # Weather Stats
-                dict(
-                    text=(f"Temperature: {stats['typical_low']:.1f}°C to {stats['typical_high']:.1f}°C<br>"
-                          f"Rain Risk: {risks['rainy']:.1f}%<br>"
-                          f"Wind Risk: {risks['windy']:.1f}%"),
-                    x=0.5, y=0.65,
-                    showarrow=False,
-                    font={'size': 16, 'color': '#00d4ff'}
-                ),
-                # Footer
-                dict(
-                    text="Generated by Parade Guards | NASA POWER API",
-                    x=0.5, y=0.1,
-                    showarrow=False,
-                    font={'size': 12, 'color': '#ffffff'}
-                )
-            ]
-        )
-        
-        # Convert to image
-        img_bytes = pio.to_image(share_fig, format="png")
-        return img_bytes
-        
+        return render_share_image(location_name, target_date, selected_activity, overall_risk, stats, risks)
     except Exception as e:
         st.error(f"Error creating shareable image: {str(e)}")
         return None
 
 # Add this after your analysis section, before the footer:
-def create_temperature_distribution(df_filtered):
-    """Create temperature distribution plot"""
-    try:
-        data = df_filtered['temperature'].dropna()
-        
-        fig = go.Figure()
-        
-        # Add histogram
-        fig.add_trace(go.Histogram(
-            x=data,
-            nbinsx=30,
-            name="Temperature Distribution",
-            marker_color="#ff0080",
-            opacity=0.7
-        ))
-
-        # Add mean line
-        mean_value = data.mean()
-        fig.add_vline(
-            x=mean_value,
-            line_dash="dash",
-            line_color="white",
-            annotation_text=f"Mean: {mean_value:.1f}°C",
-            annotation_position="top"
-        )
-
-        # Update layout
-        fig.update_layout(
-        height=500,
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font={'color': "#ffffff"},
-        margin=dict(t=50, b=50, l=50, r=50),
-        autosize=True,
-        xaxis={'automargin': True},
-        yaxis={'automargin': True}
-    )
-        return fig
-
-    except Exception as e:
-        st.error(f"Error creating temperature plot: {str(e)}")
-        return None
-
 # -----------------------------
-# Load logo as base64
+# Logo, downsized once per process (see static_assets.py)
 # -----------------------------
-try:
-    with open("2.png", "rb") as f:
-        logo_bytes = f.read()
-    logo_data_uri = f"data:image/png;base64,{base64.b64encode(logo_bytes).decode()}"
-except FileNotFoundError:
-    logo_data_uri = "2.png"
+logo_image_src = logo_src(st.get_option("server.enableStaticServing"))
 # -----------------------------
 # Responsive Header
 # -----------------------------
@@ -917,7 +661,7 @@ st.markdown(f"""
 <div class="header-container">
     <div class="header-content">
         <div class="logo-container">
-            <img src="{logo_data_uri}" class="logo-image" alt="Parade Guards Logo">
+            <img src="{logo_image_src}" class="logo-image" alt="Parade Guards Logo">
         </div>
         <div class="title-container">
             <div class="main-title">PARADE GUARDS</div>
@@ -1038,7 +782,7 @@ if st.button("🛡️ **LAUNCH PROTECTION ANALYSIS**", type="primary", use_conta
     if df.empty:
         st.error("❌ DATA UNAVAILABLE")
     else:
-        result = calculate_weather_risks(df, target_date.month, target_date.day, ACTIVITY_PROFILES[selected_activity]['thresholds'])
+        result = calculate_enhanced_weather_risks(df, target_date.month, target_date.day, ACTIVITY_PROFILES[selected_activity]['thresholds'])
         
         if result is None:
             st.error("❌ INSUFFICIENT DATA")
@@ -1094,7 +838,8 @@ if st.button("🛡️ **LAUNCH PROTECTION ANALYSIS**", type="primary", use_conta
                 })
                 
                 if format_choice == "CSV":
-                    download_data = prepare_data_with_metadata(summary, location_name, target_date)
+                    download_data = prepare_data_with_metadata(summary, location_name, target_date, latitude, longitude,
+                                                               format_choice=format_choice)
                     file_extension = "csv"
                 else:
                     download_data = summary.to_json(orient="records")
@@ -1110,7 +855,8 @@ if st.button("🛡️ **LAUNCH PROTECTION ANALYSIS**", type="primary", use_conta
             
             with col2:
                 if format_choice == "CSV":
-                    full_data = prepare_data_with_metadata(df_filtered, location_name, target_date)
+                    full_data = prepare_data_with_metadata(df_filtered, location_name, target_date, latitude, longitude,
+                                                           format_choice=format_choice)
                     file_extension = "csv"
                 else:
                     full_data = df_filtered.to_json(orient="records")
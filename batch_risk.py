@@ -0,0 +1,173 @@
+"""Headless batch scoring: a CSV of (location, date, activity) rows in, one risk report out
+
+Usage: python batch_risk.py events.csv --output risks.parquet [--processes 4] [--years-back 15]
+
+`location` is a preset city ("Toronto" or "London, Ontario") or "lat, lon".
+`date` is YYYY-MM-DD and `activity` an ACTIVITY_PROFILES name, with or
+without its icon. Rows are grouped by POWER grid cell and each cell is
+handled by one worker process. It syncs the cell's history into the shared
+on-disk history store once, then scores every row for that cell, so reruns
+and overlapping batches only download what is missing. The output is CSV,
+or Parquet when the path ends in .parquet.
+"""
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+
+import pandas as pd
+
+from analysis import score_windows
+from history_store import HISTORY_DB_PATH, HistoryStore
+from nasa_power import (MAX_CONCURRENT_REQUESTS, extract_date_windows, load_location_history, snap_to_grid,
+                        sync_location_history)
+from presets import ACTIVITY_PROFILES, find_activity, find_location
+from risk_scoring import RISK_CATEGORIES
+
+COMFORT_CATEGORIES = ['high_humidity', 'uncomfortable_heat']
+STAT_COLUMNS = ['avg_temp', 'typical_high', 'typical_low', 'max_temp_ever', 'min_temp_ever', 'avg_precip',
+                'max_precip_ever', 'avg_wind', 'max_wind_ever', 'rainy_days', 'total_days', 'years_analyzed',
+                'avg_humidity', 'avg_cloud_cover']
+
+logger = logging.getLogger("parade_guards.fetch")
+
+def parse_event_date(value):
+    """Midnight of a YYYY-MM-DD string, ValueError for blanks and anything else"""
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("Missing date, use YYYY-MM-DD")
+    try:
+        return datetime.combine(date.fromisoformat(value.strip()), datetime.min.time())
+    except ValueError:
+        raise ValueError(f"Invalid date {value!r}, use YYYY-MM-DD") from None
+
+def resolve_location(location):
+    """Grid cell for a preset city or "lat, lon" text, ValueError when unknown or out of range"""
+    lat, lon = find_location(str(location))
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"Coordinates out of range: {location}")
+    return snap_to_grid(lat, lon)
+
+def resolve_rows(events):
+    """Attach grid cell, target date and profile to each input row, or the reason it cannot be scored"""
+    resolved = []
+    for idx, row in events.iterrows():
+        item = {'row': idx, 'location': row['location'], 'date': row['date'], 'activity': row['activity']}
+        try:
+            item['grid_cell'] = resolve_location(row['location'])
+            item['target_date'] = parse_event_date(row['date'])
+            item['profile'] = find_activity(str(row['activity']))
+        except (ValueError, TypeError) as e:
+            item['status'] = str(e)
+        resolved.append(item)
+    return resolved
+
+def result_row(item, scored=None):
+    """Flat output row: input columns, grid cell, status, risks and stats"""
+    row = {'row': item['row'], 'location': item['location'], 'date': item['date'], 'activity': item['activity']}
+    cell = item.get('grid_cell')
+    row['grid_lat'], row['grid_lon'] = cell if cell else (None, None)
+    row['status'] = item.get('status', 'ok')
+    if scored is not None and scored['risks'] is None:
+        row['status'] = "insufficient data"
+
+    has_scores = scored is not None and scored['risks'] is not None
+    row['overall_risk'] = scored['overall_risk'] if has_scores else None
+    for category in RISK_CATEGORIES + COMFORT_CATEGORIES:
+        row[category] = scored['risks'].get(category) if has_scores else None
+    for column in STAT_COLUMNS:
+        row[column] = scored['stats'].get(column) if has_scores else None
+    row['confidence'] = scored['confidence'] if has_scores else None
+    return row
+
+def score_cell(cell, items, store_path, years_back, max_workers):
+    """Worker process: sync one grid cell's history, then score every row that falls in it"""
+    store = HistoryStore(store_path)
+    try:
+        sync_location_history(*cell, store, years_back=years_back, max_workers=max_workers)
+    except Exception as e:
+        # Score from whatever the store already holds
+        logger.warning("sync %.4f,%.4f failed, scoring stored history: %s", cell[0], cell[1], e)
+    history = load_location_history(*cell, store, years_back=years_back)
+
+    windows_by_date = {}
+    rows = []
+    for item in items:
+        # One bad row fails alone, not the rest of its cell
+        try:
+            target = item['target_date']
+            key = (target.month, target.day)
+            if key not in windows_by_date:
+                windows_by_date[key] = extract_date_windows(history, target.month, target.day, years_back)
+            if windows_by_date[key].empty:
+                rows.append(result_row({**item, 'status': "no data"}))
+                continue
+            thresholds = ACTIVITY_PROFILES[item['profile']]['thresholds']
+            rows.append(result_row(item, score_windows(windows_by_date[key], target.month, target.day, thresholds)))
+        except Exception as e:
+            rows.append(result_row({**item, 'status': f"failed: {e}"}))
+    return rows
+
+def run_batch(events, store_path=HISTORY_DB_PATH, years_back=15, processes=None,
+              max_workers=MAX_CONCURRENT_REQUESTS, progress_callback=None):
+    """Score every event row across a process pool, returns the results in input order"""
+    resolved = resolve_rows(events)
+    results = [result_row(item) for item in resolved if 'status' in item]
+
+    by_cell = {}
+    for item in resolved:
+        if 'status' not in item:
+            by_cell.setdefault(item['grid_cell'], []).append(item)
+
+    # Create the schema once up front rather than racing to do it in every worker
+    HistoryStore(store_path)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {executor.submit(score_cell, cell, items, store_path, years_back, max_workers): cell
+                   for cell, items in by_cell.items()}
+        for idx, future in enumerate(as_completed(futures)):
+            cell = futures[future]
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                results.extend(result_row({**item, 'status': f"failed: {e}"}) for item in by_cell[cell])
+            if progress_callback is not None:
+                progress_callback(idx + 1, len(futures), f"{cell[0]:.2f}°, {cell[1]:.2f}° ({len(by_cell[cell])} rows)")
+
+    return pd.DataFrame(results).sort_values('row').reset_index(drop=True)
+
+def write_results(df, path):
+    if path.endswith(".parquet"):
+        try:
+            df.to_parquet(path, index=False)
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow, install it or write a .csv instead")
+    else:
+        df.to_csv(path, index=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV of (location, date, activity) rows")
+    parser.add_argument("input", help="CSV with location, date and activity columns")
+    parser.add_argument("--output", default="risk_report.csv", help=".csv or .parquet")
+    parser.add_argument("--years-back", type=int, default=15)
+    parser.add_argument("--processes", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--max-workers", type=int, default=MAX_CONCURRENT_REQUESTS,
+                        help="Concurrent POWER requests per process")
+    parser.add_argument("--store", default=HISTORY_DB_PATH, help="History store shared by every worker")
+    args = parser.parse_args()
+
+    events = pd.read_csv(args.input, dtype=str)
+    missing = {'location', 'date', 'activity'} - set(events.columns)
+    if missing:
+        raise SystemExit(f"Input is missing columns: {', '.join(sorted(missing))}")
+
+    start = time.perf_counter()
+    df = run_batch(events, args.store, args.years_back, args.processes, args.max_workers,
+                   progress_callback=lambda done, total, label: print(f"  scored {label} ({done}/{total})"))
+    write_results(df, args.output)
+
+    failed = (df['status'] != 'ok').sum()
+    print(f"Wrote {len(df)} rows ({failed} not scored) to {args.output} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compare the per-year and range fetch modes against the NASA POWER API
+
+Usage: python benchmark_fetch_modes.py --lat 43.6532 --lon -79.3832 --date 07-01 --years 15 40
+
+Add --stub to run against an in-process power_stub server instead (offline,
+with --stub-latency seconds per response), or --base-url for any other server.
+"""
+import argparse
+import time
+
+import nasa_power
+from nasa_power import FETCH_MODES, fetch_weather_history
+from power_stub import PowerStub
+
+def run_mode(lat, lon, target_month, target_day, years_back, mode):
+    """Time one fetch, returns (seconds, requests made, rows, years covered)"""
+    completed = []
+    start = time.perf_counter()
+    df = fetch_weather_history(lat, lon, target_month, target_day, years_back=years_back, mode=mode,
+                               progress_callback=lambda done, total, label: completed.append(label))
+    elapsed = time.perf_counter() - start
+    years = df['year'].nunique() if not df.empty else 0
+    return elapsed, len(completed), len(df), years
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NASA POWER fetch modes")
+    parser.add_argument("--lat", type=float, default=43.6532)
+    parser.add_argument("--lon", type=float, default=-79.3832)
+    parser.add_argument("--date", default="07-01", help="Target date as MM-DD")
+    parser.add_argument("--years", type=int, nargs="+", default=[15, 40])
+    parser.add_argument("--base-url", default=None, help="POWER daily point endpoint to benchmark against")
+    parser.add_argument("--stub", action="store_true", help="Start a local power_stub server and use it")
+    parser.add_argument("--stub-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    stub = None
+    if args.stub:
+        stub = PowerStub(latency=args.stub_latency).start()
+        nasa_power.POWER_API_URL = stub.url
+    elif args.base_url:
+        nasa_power.POWER_API_URL = args.base_url
+
+    target_month, target_day = (int(part) for part in args.date.split("-"))
+
+    print(f"{'years':>6} {'mode':>9} {'seconds':>9} {'requests':>9} {'rows':>6} {'years ok':>9}")
+    for years_back in args.years:
+        for mode in FETCH_MODES:
+            elapsed, n_requests, n_rows, n_years = run_mode(args.lat, args.lon, target_month, target_day,
+                                                            years_back, mode)
+            print(f"{years_back:>6} {mode:>9} {elapsed:>9.2f} {n_requests:>9} {n_rows:>6} {n_years:>9}")
+
+    if stub is not None:
+        stub.stop()
+
+if __name__ == "__main__":
+    main()
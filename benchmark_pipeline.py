@@ -0,0 +1,150 @@
+"""Time each stage of the launch path (fetch -> score -> render) on fixed synthetic histories
+
+Usage: python benchmark_pipeline.py --years 15 40 44 --repeats 20 --output benchmark_results.json
+
+Fetches run against an in-process power_stub server, so no network is needed
+and every run sees the same data. Chart stages include the figure's JSON
+serialization, which is what st.plotly_chart sends to the browser. The share
+image stage renders the PNG the app offers for download. Each stage
+is timed `repeats` times for p50/p95, then run once more under tracemalloc
+for peak memory. Results are written as JSON to track regressions over time.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+import nasa_power
+from charts import create_probability_curve, create_weather_trend_analysis
+from history_store import HistoryStore
+from nasa_power import extract_date_windows, fetch_location_history, snap_to_grid
+from power_stub import PowerStub
+from presets import ACTIVITY_PROFILES
+from risk_scoring import calculate_enhanced_weather_risks
+from share_image import render_share_image
+
+BENCHMARK_LOCATION = (43.6532, -79.3832)  # Toronto
+BENCHMARK_ACTIVITY = "Parade/Festival 🎉"
+
+def time_stage(func, repeats, setup=None):
+    """Run `func` repeats times after one untimed warm-up, returns (latencies in ms, peak traced KB)"""
+    func(*(setup() if setup else ()))  # Lazy imports and first-call caches stay out of the numbers
+
+    latencies = []
+    for _ in range(repeats):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    args = setup() if setup else ()
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return latencies, peak / 1024
+
+def summarize(stage, years_back, latencies, peak_kb):
+    return {
+        'stage': stage,
+        'years': years_back,
+        'repeats': len(latencies),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'mean_ms': float(np.mean(latencies)),
+        'peak_kb': float(peak_kb)
+    }
+
+def benchmark_years(years_back, target_month, target_day, repeats, fetch_repeats, workdir):
+    """Results for every stage on one synthetic history length"""
+    lat, lon = snap_to_grid(*BENCHMARK_LOCATION)
+    thresholds = ACTIVITY_PROFILES[BENCHMARK_ACTIVITY]['thresholds']
+    results = []
+
+    def fresh_store():
+        path = os.path.join(workdir, f"history_{years_back}_{time.perf_counter_ns()}.sqlite3")
+        return (HistoryStore(path),)
+
+    def fetch(store):
+        history = fetch_location_history(lat, lon, years_back=years_back, store=store)
+        return extract_date_windows(history, target_month, target_day, years_back)
+
+    # Cold: empty store, every day comes from the stub. Warm: nothing left to download
+    latencies, peak = time_stage(fetch, fetch_repeats, setup=fresh_store)
+    results.append(summarize('fetch_cold', years_back, latencies, peak))
+
+    warm_store = fresh_store()
+    df = fetch(*warm_store)
+    latencies, peak = time_stage(fetch, repeats, setup=lambda: warm_store)
+    results.append(summarize('fetch_warm', years_back, latencies, peak))
+
+    risks, overall_risk, stats, df_filtered = calculate_enhanced_weather_risks(df, target_month, target_day, thresholds)
+    target_date = datetime(datetime.now().year, target_month, target_day)
+
+    stages = [
+        ('calculate_enhanced_weather_risks',
+         lambda: calculate_enhanced_weather_risks(df, target_month, target_day, thresholds)),
+        ('create_weather_trend_analysis',
+         lambda: create_weather_trend_analysis(df_filtered, 'temperature').to_json()),
+        ('create_probability_curve',
+         lambda: create_probability_curve(df_filtered, 'temperature', thresholds).to_json()),
+        ('create_shareable_image',
+         lambda: render_share_image("Toronto, Ontario", target_date, BENCHMARK_ACTIVITY, overall_risk, stats, risks)),
+    ]
+    for stage, func in stages:
+        latencies, peak = time_stage(func, repeats)
+        results.append(summarize(stage, years_back, latencies, peak))
+    return results
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fetch -> score -> render pipeline")
+    parser.add_argument("--years", type=int, nargs="+", default=[15, 40, 44])
+    parser.add_argument("--date", default="07-01", help="Target date as MM-DD")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--fetch-repeats", type=int, default=5, help="Repeats for the cold fetch stage")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Seconds the stub adds per response")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    target_month, target_day = (int(part) for part in args.date.split("-"))
+
+    results = []
+    with PowerStub(latency=args.stub_latency) as stub_url, tempfile.TemporaryDirectory() as workdir:
+        nasa_power.POWER_API_URL = stub_url
+        for years_back in args.years:
+            results.extend(benchmark_years(years_back, target_month, target_day, args.repeats,
+                                           args.fetch_repeats, workdir))
+
+    print(f"{'stage':<34} {'years':>5} {'p50 ms':>9} {'p95 ms':>9} {'peak KB':>9}")
+    for r in results:
+        print(f"{r['stage']:<34} {r['years']:>5} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['peak_kb']:>9.0f}")
+
+    report = {
+        'generated_at': datetime.now().isoformat(timespec="seconds"),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'target_date': args.date,
+        'stub_latency': args.stub_latency,
+        'results': results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Offline build step: precompute climatology for every preset city
+
+Fetches each preset city's grid cell history (through the on-disk history
+store, so an interrupted build resumes where it stopped) and writes
+data/climatology.parquet for the app to ship.
+
+Usage: python build_climatology.py [--years-back 15] [--output data/climatology.parquet]
+"""
+import argparse
+import time
+
+from climatology import CLIMATOLOGY_PATH, build_cell_climatology, write_climatology
+from history_store import HISTORY_DB_PATH, HistoryStore
+from nasa_power import analysis_years, load_location_history, snap_to_grid, sync_location_histories
+from presets import ACTIVITY_PROFILES, LOCATIONS
+
+def preset_cells():
+    """Unique grid cells covering every city in LOCATIONS"""
+    return sorted({
+        snap_to_grid(lat, lon)
+        for regions in LOCATIONS.values()
+        for cities in regions.values()
+        for lat, lon in cities.values()
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the preset city climatology artifact")
+    parser.add_argument("--years-back", type=int, default=15)
+    parser.add_argument("--output", default=CLIMATOLOGY_PATH)
+    parser.add_argument("--store", default=HISTORY_DB_PATH, help="History store used as a fetch cache")
+    args = parser.parse_args()
+
+    cells = preset_cells()
+    years = analysis_years(args.years_back)
+    store = HistoryStore(args.store)
+    print(f"Building climatology for {len(cells)} grid cells, {years[0]}-{years[-1]}")
+
+    start = time.perf_counter()
+    sync_location_histories(
+        cells, store, years_back=args.years_back,
+        progress_callback=lambda done, total, label: print(f"  fetched {label} ({done}/{total})")
+    )
+
+    frames = []
+    for cell in cells:
+        history = load_location_history(*cell, store, years_back=args.years_back)
+        if history.empty:
+            print(f"  no data for {cell}, skipped")
+            continue
+        frames.append(build_cell_climatology(history, cell[0], cell[1], years, ACTIVITY_PROFILES))
+
+    if not frames:
+        raise SystemExit("No climatology built, every fetch failed")
+
+    df = write_climatology(frames, args.output)
+    print(f"Wrote {len(df)} rows for {len(frames)} cells to {args.output} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Plotly figure builders for the analysis views (no Streamlit dependency)"""
+import numpy as np
+import plotly.graph_objects as go
+
+def create_interactive_map(lat, lon, location_name):
+    """Create an interactive map with location marker"""
+    # Built with graph_objects, plotly.express adds ~0.1 s to startup for this one marker
+    fig = go.Figure(go.Scattermapbox(
+        lat=[lat],
+        lon=[lon],
+        mode='markers',
+        hovertext=[location_name],
+        hovertemplate="<b>%{hovertext}</b><br><br>lat=%{lat}<br>lon=%{lon}<extra></extra>",
+        marker={'color': '#00d4ff'}
+    ))
+    
+    fig.update_layout(
+        mapbox_style="open-street-map",
+        mapbox={'center': {'lat': lat, 'lon': lon}, 'zoom': 8},
+        height=400,
+        margin={"r":0,"t":0,"l":0,"b":0},
+        paper_bgcolor="rgba(0,0,0,0)",
+        font={'color': "#ffffff"}
+    )
+    
+    return fig
+
+def create_risk_gauge(overall_risk):
+    if overall_risk < 20:
+        color, status = "#00ff64", "MISSION GO 🚀"
+    elif overall_risk < 40:
+        color, status = "#00d4ff", "NOMINAL ✅"
+    elif overall_risk < 60:
+        color, status = "#ffa500", "CAUTION ⚠"
+    else:
+        color, status = "#ff0080", "HIGH RISK ❌"
+    
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=overall_risk,
+        title={'text': f"🛰 {status}", 'font': {'size': 24, 'color': color, 'family': "Orbitron"}},
+        number={'suffix': "%", 'font': {'size': 48, 'color': color}},
+        gauge={
+            'axis': {'range': [0, 100], 'tickcolor': "#00d4ff"},
+            'bar': {'color': color},
+            'steps': [
+                {'range': [0, 20], 'color': 'rgba(0, 255, 100, 0.3)'},
+                {'range': [20, 40], 'color': 'rgba(0, 212, 255, 0.3)'},
+                {'range': [40, 60], 'color': 'rgba(255, 165, 0, 0.3)'},
+                {'range': [60, 100], 'color': 'rgba(255, 0, 128, 0.3)'}
+            ]
+        }
+    ))
+    
+    fig.update_layout(
+        height=350,
+        paper_bgcolor="rgba(0,0,0,0)",
+        font={'color': "#ffffff"},
+        margin=dict(t=50, b=50, l=50, r=50),  # Responsive margins
+        autosize=True  # Make plot responsive
+    )
+    return fig
+
+def create_risk_breakdown(risks):
+    labels = ['❄ COLD', '🔥 HEAT', '🌧 RAIN', '💨 WIND']
+    values = [risks['too_cold'], risks['too_hot'], risks['rainy'], risks['windy']]
+    
+    fig = go.Figure(go.Bar(
+        x=labels, y=values,
+        text=[f'{v:.1f}%' for v in values],
+        textposition='outside',
+        marker_color=['#00d4ff', '#ff0080', '#00ff64', '#ffa500']
+    ))
+    
+    fig.update_layout(
+        title={'text': '🛰 THREAT ASSESSMENT', 'font': {'color': '#00d4ff', 'family': "Orbitron"}},
+        yaxis={'gridcolor': 'rgba(0, 212, 255, 0.2)'},
+        height=400,
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font={'color': "#ffffff"}
+    )
+    return fig
+def create_weather_trend_analysis(df_filtered, variable='temperature'):
+    """Create comprehensive trend analysis with regression"""
+    fig = go.Figure()
+    
+    # Group by year and calculate mean
+    yearly_data = df_filtered.groupby('year')[variable].mean().reset_index()
+    
+    # Add scatter plot
+    fig.add_trace(go.Scatter(
+        x=yearly_data['year'],
+        y=yearly_data[variable],
+        mode='markers',
+        name='Yearly Average',
+        marker=dict(size=10, color='#00d4ff')
+    ))
+    
+    # Add trend line
+    if len(yearly_data) > 2:
+        z = np.polyfit(yearly_data['year'], yearly_data[variable], 1)
+        p = np.poly1d(z)
+        
+        fig.add_trace(go.Scatter(
+            x=yearly_data['year'],
+            y=p(yearly_data['year']),
+            mode='lines',
+            name=f'Trend (slope: {z[0]:.3f}°C/year)',
+            line=dict(color='#ff0080', width=3, dash='dash')
+        ))
+    
+    # Add moving average
+    if len(yearly_data) >= 3:
+        yearly_data['ma'] = yearly_data[variable].rolling(window=3, center=True).mean()
+        fig.add_trace(go.Scatter(
+            x=yearly_data['year'],
+            y=yearly_data['ma'],
+            mode='lines',
+            name='3-Year Moving Average',
+            line=dict(color='#00ff64', width=2)
+        ))
+    
+    fig.update_layout(
+        title=f'🔮 Long-term {variable.replace("_", " ").title()} Trend',
+        xaxis_title='Year',
+        yaxis_title=f'{variable.replace("_", " ").title()}',
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font={'color': "#ffffff"},
+        hovermode='x unified',
+        height=450
+    )
+    
+    return fig
+def create_probability_curve(df_filtered, variable, thresholds):
+    """Create probability distribution with bell curve"""
+    data = df_filtered[variable].dropna()
+    
+    if len(data) < 10:
+        return None
+    
+    fig = go.Figure()
+    
+    # Histogram
+    fig.add_trace(go.Histogram(
+        x=data,
+        nbinsx=30,
+        name="Observed Frequency",
+        marker_color='#00d4ff',
+        opacity=0.7,
+        histnorm='probability density'
+    ))
+    
+    # Fit normal distribution
+    mu = data.mean()
+    sigma = data.std()
+    x_range = np.linspace(data.min(), data.max(), 100)
+    # Normal pdf directly, scipy.stats alone takes ~0.5 s to import
+    y_fit = np.exp(-0.5 * ((x_range - mu) / sigma) ** 2) / (sigma * np.sqrt(2 * np.pi))
+    
+    fig.add_trace(go.Scatter(
+        x=x_range,
+        y=y_fit,
+        mode='lines',
+        name='Normal Distribution Fit',
+        line=dict(color='#ff0080', width=3)
+    ))
+    
+    # Add threshold markers
+    if variable == 'temperature' and 'temp_max' in thresholds:
+        fig.add_vline(
+            x=thresholds['temp_max'],
+            line_dash="dash",
+            line_color="#ff0080",
+            annotation_text=f"Too Hot: {thresholds['temp_max']}°C"
+        )
+    elif variable == 'precipitation' and 'rain' in thresholds:
+        fig.add_vline(
+            x=thresholds['rain'],
+            line_dash="dash",
+            line_color="#00ff64",
+            annotation_text=f"Rain Threshold: {thresholds['rain']}mm"
+        )
+    
+    fig.update_layout(
+        title=f'📊 Probability Distribution - {variable.replace("_", " ").title()}',
+        xaxis_title=variable.replace("_", " ").title(),
+        yaxis_title='Probability Density',
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font={'color': "#ffffff"},
+        height=400,
+        showlegend=True
+    )
+    
+    return fig
+
+def create_temperature_distribution(df_filtered):
+    """Create temperature distribution plot"""
+    data = df_filtered['temperature'].dropna()
+    
+    fig = go.Figure()
+    
+    # Add histogram
+    fig.add_trace(go.Histogram(
+        x=data,
+        nbinsx=30,
+        name="Temperature Distribution",
+        marker_color="#ff0080",
+        opacity=0.7
+    ))
+    
+    # Add mean line
+    mean_value = data.mean()
+    fig.add_vline(
+        x=mean_value,
+        line_dash="dash",
+        line_color="white",
+        annotation_text=f"Mean: {mean_value:.1f}°C",
+        annotation_position="top"
+    )
+    
+    # Update layout
+    fig.update_layout(
+        height=500,
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font={'color': "#ffffff"},
+        margin=dict(t=50, b=50, l=50, r=50),
+        autosize=True,
+        xaxis={'automargin': True},
+        yaxis={'automargin': True}
+    )
+    return fig
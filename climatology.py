@@ -0,0 +1,200 @@
+"""Precomputed per-day-of-year climatology for the preset cities
+
+build_climatology.py writes one row per (grid cell, month, day) target date
+into a Parquet file. Each row holds the same ±3-day same-month window the
+live analysis uses: quantiles, exceedance counts per threshold bucket, bad-day
+counts per activity profile and yearly means for trends. Preset-city questions
+can then be answered with no network calls.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from risk_scoring import RISK_CATEGORIES, MIN_WINDOW_DAYS
+
+CLIMATOLOGY_PATH = os.environ.get(
+    "PARADE_GUARDS_CLIMATOLOGY",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "climatology.parquet")
+)
+
+QUANTILES = [10, 25, 50, 75, 90]
+QUANTILE_VARIABLES = ['temperature', 'temp_max', 'temp_min', 'precipitation', 'wind_speed']
+YEARLY_VARIABLES = ['temperature', 'precipitation', 'wind_speed', 'humidity']
+
+# Threshold buckets: (column, comparison, risk category, bucket values). A
+# bucket column counts the window days where `column <comparison> value`
+EXCEEDANCE_BUCKETS = [
+    ('temp_min', 'lt', 'too_cold', range(-20, 31)),
+    ('temp_max', 'gt', 'too_hot', range(10, 46)),
+    ('precipitation', 'ge', 'rainy', range(0, 21)),
+    ('wind_speed', 'ge', 'windy', range(0, 26)),
+]
+THRESHOLD_KEYS = {'too_cold': 'temp_min', 'too_hot': 'temp_max', 'rainy': 'rain', 'windy': 'wind'}
+
+def bucket_column(column, comparison, value):
+    return f"{column}_{comparison}_{value}"
+
+def thresholds_column(thresholds):
+    """Column holding the bad-day count for one set of activity thresholds"""
+    return "bad_days_{temp_min:g}_{temp_max:g}_{rain:g}_{wind:g}".format(**thresholds)
+
+def build_cell_climatology(history, lat, lon, years, profiles):
+    """Climatology rows for every target date of one grid cell's daily history"""
+    history = history[history['date'].dt.year.isin(years)]
+    months = history['month'].to_numpy()
+    days = history['day'].to_numpy()
+    years_column = history['date'].dt.year.to_numpy()
+    values = {column: history[column].to_numpy(dtype=float)
+              for column in set(QUANTILE_VARIABLES + YEARLY_VARIABLES + ['humidity', 'cloud_cover', 'heat_index'])}
+
+    comparisons = {'lt': np.less, 'gt': np.greater, 'ge': np.greater_equal}
+    unique_thresholds = {thresholds_column(p['thresholds']): p['thresholds'] for p in profiles.values()}
+
+    rows = []
+    for target in pd.date_range("2000-01-01", "2000-12-31"):  # leap year, so Feb 29 is included
+        mask = (months == target.month) & (np.abs(days - target.day) <= 3)
+        total_days = int(mask.sum())
+        if total_days == 0:
+            continue
+
+        window = {column: array[mask] for column, array in values.items()}
+        window_years = years_column[mask]
+        row = {
+            'lat': lat, 'lon': lon, 'month': target.month, 'day': target.day,
+            'total_days': total_days,
+            'years_analyzed': int(len(np.unique(window_years))),
+            'avg_temp': np.nanmean(window['temperature']),
+            'avg_precip': np.nanmean(window['precipitation']),
+            'avg_wind': np.nanmean(window['wind_speed']),
+            'max_temp_ever': np.nanmax(window['temp_max']),
+            'min_temp_ever': np.nanmin(window['temp_min']),
+            'max_precip_ever': np.nanmax(window['precipitation']),
+            'max_wind_ever': np.nanmax(window['wind_speed']),
+            'rainy_days': int((window['precipitation'] >= 1.0).sum()),
+            'avg_humidity': np.nanmean(window['humidity']) if np.isfinite(window['humidity']).any() else np.nan,
+            'avg_cloud_cover': np.nanmean(window['cloud_cover']) if np.isfinite(window['cloud_cover']).any() else np.nan,
+            'humidity_days': int(np.isfinite(window['humidity']).sum()),
+            'high_humidity_days': int((window['humidity'] > 80).sum()),
+            'heat_index_days': int(np.isfinite(window['heat_index']).sum()),
+            'uncomfortable_heat_days': int((window['heat_index'] > 35).sum()),
+        }
+
+        for column in QUANTILE_VARIABLES:
+            for q, value in zip(QUANTILES, np.nanpercentile(window[column], QUANTILES)):
+                row[f"{column}_q{q}"] = value
+
+        for column, comparison, _, buckets in EXCEEDANCE_BUCKETS:
+            bucket_values = np.array(buckets, dtype=float)
+            counts = comparisons[comparison](window[column][:, None], bucket_values[None, :]).sum(axis=0)
+            for value, count in zip(buckets, counts):
+                row[bucket_column(column, comparison, value)] = int(count)
+
+        for key, thresholds in unique_thresholds.items():
+            bad = ((window['temp_min'] < thresholds['temp_min']) | (window['temp_max'] > thresholds['temp_max']) |
+                   (window['precipitation'] >= thresholds['rain']) | (window['wind_speed'] >= thresholds['wind']))
+            row[key] = int(bad.sum())
+
+        # Yearly means of the window, kept as aligned lists for trend charts
+        window_year_list = sorted(np.unique(window_years).tolist())
+        row['years'] = window_year_list
+        for column in YEARLY_VARIABLES:
+            row[f"{column}_yearly"] = [
+                float(np.nanmean(window[column][window_years == year]))
+                if np.isfinite(window[column][window_years == year]).any() else np.nan
+                for year in window_year_list
+            ]
+        rows.append(row)
+
+    return pd.DataFrame(rows)
+
+def write_climatology(frames, path=CLIMATOLOGY_PATH):
+    """Write the per-cell climatology frames as one compact Parquet file"""
+    df = pd.concat(frames, ignore_index=True)
+    for column in df.columns:
+        if df[column].dtype == 'float64':
+            df[column] = df[column].astype('float32')
+        elif df[column].dtype == 'int64' and column not in ('month', 'day'):
+            df[column] = df[column].astype('int16')
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_parquet(path, index=False, compression='zstd')
+    return df
+
+def load_climatology(path=CLIMATOLOGY_PATH):
+    """Climatology indexed by (lat, lon, month, day), or None if it was never built"""
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path)
+    except ImportError:
+        # pyarrow is optional, without it the app just uses live data
+        return None
+    return df.set_index(['lat', 'lon', 'month', 'day']).sort_index()
+
+def _bucket_count(row, category, threshold):
+    for column, comparison, bucket_category, buckets in EXCEEDANCE_BUCKETS:
+        if bucket_category == category and float(threshold).is_integer() and int(threshold) in buckets:
+            return row[bucket_column(column, comparison, int(threshold))]
+    return None
+
+def climatology_calendar(clim, lat, lon, thresholds):
+    """Same frame as risk_scoring.daily_risk_calendar for one cell, or None if not covered"""
+    key = thresholds_column(thresholds)
+    if clim is None or key not in clim.columns:
+        return None
+    try:
+        cell = clim.loc[(float(lat), float(lon))]
+    except KeyError:
+        return None
+
+    calendar = pd.DataFrame(index=cell.index)
+    totals = cell['total_days'].astype(int)
+    for category in RISK_CATEGORIES:
+        counts = _bucket_count(cell, category, thresholds[THRESHOLD_KEYS[category]])
+        if counts is None:
+            return None
+        calendar[category] = counts / totals * 100
+    calendar['overall_risk'] = cell[key] / totals * 100
+    calendar['total_days'] = totals
+    return calendar
+
+def climatology_risks(clim, lat, lon, target_month, target_day, thresholds):
+    """(risks, overall_risk, stats) for a target date straight from the artifact
+
+    Mirrors calculate_enhanced_weather_risks without the window frame. Returns
+    None when the cell, date or thresholds are not covered, or there is too
+    little data.
+    """
+    calendar = climatology_calendar(clim, lat, lon, thresholds)
+    if calendar is None or (target_month, target_day) not in calendar.index:
+        return None
+    row = clim.loc[(float(lat), float(lon), target_month, target_day)]
+    total_days = int(row['total_days'])
+    if total_days < MIN_WINDOW_DAYS:
+        return None
+
+    day = calendar.loc[(target_month, target_day)]
+    risks = {category: float(day[category]) for category in RISK_CATEGORIES}
+    if row['humidity_days'] > 10:
+        risks['high_humidity'] = row['high_humidity_days'] / total_days * 100
+    if row['heat_index_days'] > 10:
+        risks['uncomfortable_heat'] = row['uncomfortable_heat_days'] / total_days * 100
+
+    stats = {
+        'avg_temp': float(row['avg_temp']),
+        'typical_high': float(row['temp_max_q50']),
+        'typical_low': float(row['temp_min_q50']),
+        'max_temp_ever': float(row['max_temp_ever']),
+        'min_temp_ever': float(row['min_temp_ever']),
+        'avg_precip': float(row['avg_precip']),
+        'max_precip_ever': float(row['max_precip_ever']),
+        'avg_wind': float(row['avg_wind']),
+        'max_wind_ever': float(row['max_wind_ever']),
+        'rainy_days': int(row['rainy_days']),
+        'total_days': total_days,
+        'years_analyzed': int(row['years_analyzed']),
+        'avg_humidity': float(row['avg_humidity']) if np.isfinite(row['avg_humidity']) else None,
+        'avg_cloud_cover': float(row['avg_cloud_cover']) if np.isfinite(row['avg_cloud_cover']) else None
+    }
+    return risks, float(day['overall_risk']), stats
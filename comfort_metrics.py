@@ -0,0 +1,81 @@
+"""Vectorized derived comfort metrics computed over whole DataFrame columns
+
+Every function takes NumPy arrays (or pandas Series) in metric units and
+returns a float array, with NaN wherever an input is missing or the metric
+is not defined for those conditions.
+"""
+import numpy as np
+
+HEAT_INDEX_MIN_TEMP = 27  # °C, heat index is only reported at or above this temperature
+WIND_CHILL_MAX_TEMP = 10  # °C, wind chill is only defined at or below this temperature
+WIND_CHILL_MIN_WIND = 4.8  # km/h, calmer air has no wind chill effect
+
+def _as_float(values):
+    return np.asarray(values, dtype=float)
+
+def heat_index(temp_c, humidity):
+    """NWS heat index in °C, including the low and high humidity adjustments"""
+    temp_f = _as_float(temp_c) * 9/5 + 32
+    rh = _as_float(humidity)
+
+    # Steadman's simple formula is used until it (averaged with T) reaches 80°F
+    simple = 0.5 * (temp_f + 61.0 + (temp_f - 68.0) * 1.2 + rh * 0.094)
+
+    # Rothfusz regression
+    full = (-42.379 + 2.04901523*temp_f + 10.14333127*rh
+            - 0.22475541*temp_f*rh - 0.00683783*temp_f*temp_f
+            - 0.05481717*rh*rh + 0.00122874*temp_f*temp_f*rh
+            + 0.00085282*temp_f*rh*rh - 0.00000199*temp_f*temp_f*rh*rh)
+
+    # Dry air between 80°F and 112°F feels cooler than the regression says
+    dry = (rh < 13) & (temp_f >= 80) & (temp_f <= 112)
+    dry_adjustment = ((13 - rh) / 4) * np.sqrt(np.clip((17 - np.abs(temp_f - 95)) / 17, 0, None))
+    full = np.where(dry, full - dry_adjustment, full)
+
+    # Very humid air between 80°F and 87°F feels warmer
+    humid = (rh > 85) & (temp_f >= 80) & (temp_f <= 87)
+    full = np.where(humid, full + ((rh - 85) / 10) * ((87 - temp_f) / 5), full)
+
+    hi_f = np.where((simple + temp_f) / 2 >= 80, full, simple)
+    hi_f = np.where(rh > 0, hi_f, np.nan)
+    return (hi_f - 32) * 5/9
+
+def wind_chill(temp_c, wind_ms):
+    """Environment Canada / NWS wind chill index in °C
+
+    POWER winds are 2 m values (WS2M), slightly lower than the 10 m wind the
+    formula was fitted on, so this errs on the mild side.
+    """
+    temp = _as_float(temp_c)
+    wind_kmh = _as_float(wind_ms) * 3.6
+    with np.errstate(invalid='ignore'):
+        speed_term = np.power(wind_kmh, 0.16)
+    chill = 13.12 + 0.6215*temp - 11.37*speed_term + 0.3965*temp*speed_term
+    valid = (temp <= WIND_CHILL_MAX_TEMP) & (wind_kmh >= WIND_CHILL_MIN_WIND)
+    return np.where(valid, chill, np.nan)
+
+def dew_point(temp_c, humidity):
+    """Dew point in °C from the Magnus approximation"""
+    temp = _as_float(temp_c)
+    rh = _as_float(humidity)
+    a, b = 17.625, 243.04
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma = np.log(rh / 100) + a * temp / (b + temp)
+    return np.where(rh > 0, b * gamma / (a - gamma), np.nan)
+
+def humidex(temp_c, dew_point_c):
+    """Canadian humidex in °C"""
+    temp = _as_float(temp_c)
+    vapour_pressure = 6.11 * np.exp(5417.7530 * (1/273.16 - 1/(273.15 + _as_float(dew_point_c))))
+    return temp + 0.5555 * (vapour_pressure - 10)
+
+def add_comfort_metrics(df):
+    """Add heat_index, wind_chill, dew_point and humidex columns in one array pass"""
+    temp = df['temperature'].to_numpy(dtype=float)
+    rh = df['humidity'].to_numpy(dtype=float)
+
+    df['heat_index'] = np.where(temp >= HEAT_INDEX_MIN_TEMP, heat_index(temp, rh), np.nan)
+    df['wind_chill'] = wind_chill(temp, df['wind_speed'].to_numpy(dtype=float))
+    df['dew_point'] = dew_point(temp, rh)
+    df['humidex'] = humidex(temp, df['dew_point'].to_numpy())
+    return df
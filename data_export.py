@@ -0,0 +1,180 @@
+"""Download payloads for an analysis: data frames with their provenance metadata
+
+Exports are written chunk by chunk into one binary buffer, so a
+multi-decade or multi-location export never builds intermediate strings of
+the whole payload. Each record is serialized once, straight to the output.
+Pass export_file a DataFrame or any iterable of DataFrames, e.g.
+nasa_power.iter_location_history.
+
+Usage: python data_export.py  (checks every format against st.download_button's data conversion)
+"""
+import gzip
+import io
+import json
+from datetime import datetime
+
+import pandas as pd
+
+# Download format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "JSON": ("json", "application/json"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "NDJSON (gzip)": ("ndjson.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+EXPORT_CHUNK_ROWS = 50_000  # Rows serialized per write
+
+def export_metadata(columns, location, date, latitude, longitude, grid_cell=None):
+    """Provenance block written at the head of every export"""
+    metadata = {
+        "data_source": "NASA POWER API",
+        "location": location,
+        "coordinates": f"Lat: {latitude}, Lon: {longitude}",
+    }
+    if grid_cell is not None:
+        metadata["grid_cell"] = f"Lat: {grid_cell[0]}, Lon: {grid_cell[1]}"
+    metadata.update({
+        "date_generated": datetime.now().strftime("%Y-%m-%d"),
+        "units": {
+            "temperature": "Celsius",
+            "precipitation": "mm",
+            "wind_speed": "m/s"
+        },
+        "data_variables": list(columns),
+        "analysis_date": date.strftime("%Y-%m-%d")
+    })
+    return metadata
+
+def _chunks(frames, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Slices of at most chunk_rows rows from a DataFrame or an iterable of them"""
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames]
+    empty, wrote = None, False
+    for frame in frames:
+        if empty is None:
+            empty = frame.iloc[0:0]
+        for start in range(0, len(frame), chunk_rows):
+            yield frame.iloc[start:start + chunk_rows]
+            wrote = True
+    if not wrote and empty is not None:
+        # Nothing to write, but CSV still gets its header and Parquet its schema
+        yield empty
+
+def _write_csv(chunks, out, metadata):
+    out.write(("\n".join(f"# {k}: {v}" for k, v in metadata.items()) + "\n\n").encode())
+    header = True
+    for chunk in chunks:
+        out.write(chunk.to_csv(index=False, header=header).encode())
+        header = False
+
+def _write_json(chunks, out, metadata):
+    out.write(b'{"metadata": ' + json.dumps(metadata).encode() + b', "data": [')
+    first = True
+    for chunk in chunks:
+        # Records of one chunk, without their enclosing brackets
+        records = chunk.to_json(orient="records", date_format="iso")[1:-1]
+        if records:
+            out.write(records.encode() if first else b"," + records.encode())
+            first = False
+    out.write(b"]}")
+
+def _write_ndjson(chunks, out, metadata):
+    """First line is {"metadata": ...}, then one record per line"""
+    out.write(json.dumps({"metadata": metadata}).encode() + b"\n")
+    for chunk in chunks:
+        if not chunk.empty:
+            out.write(chunk.to_json(orient="records", lines=True, date_format="iso").rstrip("\n").encode() + b"\n")
+
+def _write_parquet(chunks, out, metadata):
+    """One row group per chunk, metadata kept in the file's schema metadata"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = table.schema.with_metadata({**(table.schema.metadata or {}),
+                                                     b"parade_guards": json.dumps(metadata).encode()})
+                writer = pq.ParquetWriter(out, schema, compression="zstd")
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+def write_export(frames, out, format_choice, metadata, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Stream `frames` into the binary file `out` in one of the EXPORT_FORMATS"""
+    if format_choice not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {format_choice}")
+    chunks = _chunks(frames, chunk_rows)
+
+    if format_choice == "Parquet":
+        _write_parquet(chunks, out, metadata)
+    elif format_choice.endswith("(gzip)"):
+        with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6) as compressed:
+            if format_choice.startswith("NDJSON"):
+                _write_ndjson(chunks, compressed, metadata)
+            else:
+                _write_csv(chunks, compressed, metadata)
+    elif format_choice == "JSON":
+        _write_json(chunks, out, metadata)
+    else:
+        _write_csv(chunks, out, metadata)
+
+def export_file(frames, format_choice, metadata, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Export as bytes
+
+    Hand it to st.download_button inside a callable so it only runs when
+    the button is clicked. The callable must return str, bytes or a
+    BytesIO-like object, which Streamlit keeps in memory to serve anyway.
+    """
+    out = io.BytesIO()
+    write_export(frames, out, format_choice, metadata, chunk_rows)
+    return out.getvalue()
+
+def export_file_name(stem, format_choice):
+    return f"{stem}.{EXPORT_FORMATS[format_choice][0]}"
+
+def export_mime(format_choice):
+    return EXPORT_FORMATS[format_choice][1]
+
+def prepare_data_with_metadata(df, location, date, latitude, longitude, grid_cell=None, format_choice="CSV"):
+    """Add metadata to downloaded data
+
+    `format_choice` is "CSV" (metadata as leading # comment lines) or "JSON"
+    (a {"metadata", "data"} document). Returns the payload as a string, see
+    export_file for large or compressed exports.
+    """
+    metadata = export_metadata(df.columns, location, date, latitude, longitude, grid_cell)
+    out = io.BytesIO()
+    write_export(df, out, "JSON" if format_choice == "JSON" else "CSV", metadata)
+    return out.getvalue().decode()
+
+def check_download_formats():
+    """Round-trip a small export in every format through st.download_button's data conversion"""
+    from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+    df = pd.DataFrame({'date': pd.date_range("2020-01-01", periods=3), 'temp_max': [1.5, 2.0, None]})
+    metadata = export_metadata(df.columns, "Check", datetime(2020, 1, 1), 0.0, 0.0)
+    for format_choice in EXPORT_FORMATS:
+        data = export_file(df, format_choice, metadata, chunk_rows=2)
+        payload, _ = convert_data_to_bytes_and_infer_mime(data, TypeError(f"{format_choice}: unsupported type"))
+        if format_choice == "Parquet":
+            import pyarrow.parquet as pq
+            rows = pq.read_table(io.BytesIO(payload)).num_rows
+        else:
+            text = gzip.decompress(payload).decode() if format_choice.endswith("(gzip)") else payload.decode()
+            if format_choice == "JSON":
+                rows = len(json.loads(text)['data'])
+            elif format_choice.startswith("NDJSON"):
+                rows = len(text.splitlines()) - 1
+            else:
+                rows = len(pd.read_csv(io.StringIO(text), comment="#"))
+        if rows != len(df):
+            raise AssertionError(f"{format_choice}: {rows} rows, expected {len(df)}")
+        print(f"{format_choice:<14} {len(payload):6d} bytes  {rows} rows  ok")
+
+if __name__ == "__main__":
+    check_download_formats()
@@ -0,0 +1,166 @@
+"""Structured diagnostics for a fetch: every POWER request, store hits and per-year coverage
+
+Pass a FetchReport as `report=` to the nasa_power fetch functions. Worker
+threads record into it as requests finish. Afterwards it can tell a slow
+analysis (latency, retries) from a partially failed one (missing years and
+the reason each one is missing).
+"""
+import logging
+import threading
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import requests
+
+from nasa_power import WINDOW_DAYS, year_centers
+
+logger = logging.getLogger("parade_guards.fetch")
+
+def describe_error(exc):
+    """Short reason for a failed request, e.g. 'HTTP 429' or 'timeout'"""
+    response = getattr(exc, 'response', None)
+    if response is not None:
+        return f"HTTP {response.status_code}"
+    if isinstance(exc, requests.Timeout):
+        return "timeout"
+    if isinstance(exc, requests.ConnectionError):
+        return "connection error"
+    if isinstance(exc, ValueError):
+        return "invalid JSON response"
+    return type(exc).__name__
+
+def _overlaps(start_a, end_a, start_b, end_b):
+    return start_a <= end_b and start_b <= end_a
+
+class FetchReport:
+    """Thread-safe record of one analysis fetch"""
+
+    def __init__(self):
+        self.requests = []
+        self.cached_ranges = []
+        self._lock = threading.Lock()
+
+    def record_request(self, lat, lon, start_date, end_date, status, latency, bytes_received=0, retries=0,
+                       reason=None, shared=False):
+        """One POWER request: status is 'ok', 'empty' (no parameter block) or 'failed'
+
+        `shared` marks a request answered by another caller's identical
+        in-flight request, so its bytes and retries are not counted twice.
+        """
+        with self._lock:
+            self.requests.append({
+                'lat': lat, 'lon': lon, 'start': start_date, 'end': end_date, 'status': status,
+                'latency': latency, 'bytes': bytes_received, 'retries': retries, 'reason': reason, 'shared': shared
+            })
+
+    def record_response(self, lat, lon, start_date, end_date, latency, response, parameters, shared=False):
+        self.record_request(lat, lon, start_date, end_date, 'ok' if parameters else 'empty', latency,
+                            0 if shared else len(response.content), 0 if shared else getattr(response, 'retries', 0),
+                            None if parameters else "no data in response", shared)
+
+    def record_failure(self, lat, lon, start_date, end_date, latency, exc, shared=False):
+        self.record_request(lat, lon, start_date, end_date, 'failed', latency,
+                            retries=0 if shared else getattr(exc, 'retries', 0), reason=describe_error(exc),
+                            shared=shared)
+
+    def record_store_lookup(self, lat, lon, start_date, end_date, missing_ranges):
+        """Remember which parts of a span were already in the history store"""
+        cached = []
+        day = start_date
+        for missing_start, missing_end in missing_ranges:
+            if missing_start > day:
+                cached.append((lat, lon, day, missing_start - timedelta(days=1)))
+            day = missing_end + timedelta(days=1)
+        if day <= end_date:
+            cached.append((lat, lon, day, end_date))
+        with self._lock:
+            self.cached_ranges.extend(cached)
+
+    def requests_frame(self):
+        columns = ['lat', 'lon', 'start', 'end', 'status', 'latency', 'bytes', 'retries', 'reason', 'shared']
+        with self._lock:
+            return pd.DataFrame(self.requests, columns=columns)
+
+    def summary(self):
+        """Totals across every request, plus store hits, misses and requests shared with other callers"""
+        with self._lock:
+            requests_made = list(self.requests)
+            cache_hits = len(self.cached_ranges)
+        latencies = [r['latency'] for r in requests_made]
+        return {
+            'requests': len(requests_made),
+            'failed': sum(r['status'] == 'failed' for r in requests_made),
+            'empty': sum(r['status'] == 'empty' for r in requests_made),
+            'retries': sum(r['retries'] for r in requests_made),
+            'bytes': sum(r['bytes'] for r in requests_made),
+            'latency_p50': float(np.median(latencies)) if latencies else None,
+            'latency_max': max(latencies) if latencies else None,
+            'cache_hits': cache_hits,
+            'cache_misses': len(requests_made),
+            'shared': sum(r['shared'] for r in requests_made)
+        }
+
+    def year_status(self, windows, years, target_month, target_day, window_days=WINDOW_DAYS):
+        """One row per analysis year: days found, where they came from and why any are missing
+
+        `windows` is the frame returned by extract_date_windows or
+        fetch_weather_history. Status is 'ok' for a full window, 'partial' or
+        'missing' otherwise, with the failure reasons of the requests that
+        covered that year.
+        """
+        centers = year_centers(years, target_month, target_day)
+        days_found = windows['year'].value_counts() if not windows.empty else pd.Series(dtype=int)
+        expected = 2 * window_days + 1
+        with self._lock:
+            requests_made = list(self.requests)
+            cached_ranges = list(self.cached_ranges)
+
+        rows = []
+        for year in years:
+            center = centers.get(year)
+            if center is None:
+                rows.append({'year': year, 'days': 0, 'source': None, 'status': 'missing',
+                             'reason': "date does not exist this year"})
+                continue
+            start, end = center - timedelta(days=window_days), center + timedelta(days=window_days)
+            covering = [r for r in requests_made if _overlaps(r['start'], r['end'], start, end)]
+            from_store = any(_overlaps(s, e, start, end) for _, _, s, e in cached_ranges)
+
+            days = int(days_found.get(year, 0))
+            status = 'ok' if days >= expected else 'partial' if days else 'missing'
+            source = ('mixed' if covering and from_store else 'network' if covering
+                      else 'cache' if from_store else None)
+
+            reason = None
+            if status != 'ok':
+                reasons = sorted({r['reason'] for r in covering if r['status'] != 'ok' and r['reason']})
+                if reasons:
+                    reason = ", ".join(reasons)
+                elif not covering and not from_store:
+                    reason = "not requested"
+                else:
+                    reason = "fill values or incomplete days dropped"
+            rows.append({'year': year, 'days': days, 'source': source, 'status': status, 'reason': reason})
+
+        return pd.DataFrame(rows, columns=['year', 'days', 'source', 'status', 'reason'])
+
+    def diagnostics(self, windows, years, target_month, target_day, window_days=WINDOW_DAYS):
+        """Summary, per-year coverage and request log in one dict"""
+        return {
+            'summary': self.summary(),
+            'years': self.year_status(windows, years, target_month, target_day, window_days),
+            'requests': self.requests_frame()
+        }
+
+    def log(self, label=""):
+        """Log the summary at INFO and every failed request at WARNING"""
+        summary = self.summary()
+        latency = f"{summary['latency_p50']:.2f}s" if summary['latency_p50'] is not None else "n/a"
+        logger.info("fetch %s: %d requests (%d failed, %d empty, %d retries), %.1f KB, p50 latency %s, "
+                    "%d store hits", label, summary['requests'], summary['failed'], summary['empty'],
+                    summary['retries'], summary['bytes'] / 1024, latency, summary['cache_hits'])
+        for r in self.requests_frame().itertuples():
+            if r.status == 'failed':
+                logger.warning("fetch %s: %.4f,%.4f %s to %s failed after %d retries: %s", label, r.lat, r.lon,
+                               f"{r.start:%Y-%m-%d}", f"{r.end:%Y-%m-%d}", r.retries, r.reason)
@@ -0,0 +1,74 @@
+"""Process-wide LRU of built plotly figures, keyed on a content fingerprint of their inputs
+
+Streamlit reruns the whole script on every widget change, so without this
+every chart panel is rebuilt even when only one selectbox moved. Figures are
+cached as built objects, not JSON. st.plotly_chart re-validates any dict or
+JSON it is handed, which costs more than building the figure again. From an
+already built figure it only has to serialize.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+FIGURE_CACHE_ENTRIES = 256  # Figures kept across all sessions, least recently used evicted first
+
+def _feed(digest, part):
+    if isinstance(part, pd.DataFrame):
+        digest.update(repr((list(part.columns), part.shape)).encode())
+        digest.update(pd.util.hash_pandas_object(part, index=True).values.tobytes())
+    elif isinstance(part, dict):
+        for key in sorted(part, key=repr):
+            digest.update(repr(key).encode())
+            _feed(digest, part[key])
+    elif isinstance(part, (list, tuple)):
+        for item in part:
+            _feed(digest, item)
+    else:
+        digest.update(repr(part).encode())
+    digest.update(b"\x00")
+
+def fingerprint(*parts):
+    """Short content hash of DataFrames, dicts and plain values, stable across sessions"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        _feed(digest, part)
+    return digest.hexdigest()
+
+class FigureCache:
+    """Thread-safe LRU of figures keyed on (builder name, key)
+
+    Callers pass a key that already identifies the builder's inputs, e.g. an
+    analysis fingerprint plus the selected variable, so a cache hit costs no
+    hashing. Treat returned figures as read-only, they are shared between
+    sessions.
+    """
+
+    def __init__(self, max_entries=FIGURE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0}
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, builder, *args):
+        """Cached figure for `key`, built with builder(*args) on a miss"""
+        cache_key = (builder.__name__, key)
+        with self._lock:
+            if cache_key in self._figures:
+                self._figures.move_to_end(cache_key)
+                self.stats['hits'] += 1
+                return self._figures[cache_key]
+            self.stats['misses'] += 1
+
+        # Built outside the lock, two sessions missing at once just build it twice
+        figure = builder(*args)
+        with self._lock:
+            self._figures[cache_key] = figure
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
@@ -1,29 +1,28 @@
 import streamlit as st
-import requests
 import pandas as pd
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
-import plotly.express as px
 import numpy as np
-import os
 import base64
-from PIL import Image
-import io
-import plotly.io as pio
-import json
 import urllib.parse
-from scipy import stats as scipy_stats
+from functools import partial
+from itertools import chain
 import streamlit.components.v1 as components
-
-def fetch_additional_data(lat, lon, start_date, end_date):
-    """Fetch additional data from GES DISC OPeNDAP"""
-    try:
-        # GES DISC API endpoint
-        ges_disc_url = f"https://disc.gsfc.nasa.gov/api/search?lat={lat}&lon={lon}&startTime={start_date}&endTime={end_date}"
-        response = requests.get(ges_disc_url)
-        return response.json()
-    except:
-        return None
+from nasa_power import (MAX_CONCURRENT_REQUESTS, analysis_years, extract_date_windows, iter_location_history,
+                        load_location_history, snap_to_grid, sync_location_histories, sync_location_history)
+from history_store import HistoryStore
+from fetch_report import FetchReport
+from presets import ACTIVITY_PROFILES, LOCATIONS
+from climatology import climatology_calendar, climatology_risks, load_climatology
+from charts import (create_interactive_map, create_probability_curve, create_risk_breakdown, create_risk_gauge,
+                    create_temperature_distribution, create_weather_trend_analysis)
+from risk_scoring import compare_locations, find_best_dates, rank_dates, score_profiles
+from analysis import run_analysis
+from figure_cache import FigureCache, fingerprint
+from share_image import render_share_image
+from data_export import EXPORT_FORMATS, export_file, export_file_name, export_metadata, export_mime
+from streamlit_progress import streamlit_progress
+from static_assets import logo_src
 
 # Page config - MUST be first
 st.set_page_config(
@@ -373,142 +372,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# -----------------------------
-# Global Cities Database (Same as before)
-# -----------------------------
-# Replace the existing LOCATIONS dictionary with this expanded version
-
-LOCATIONS = {
-    "🇨🇦 Canada": {
-        "Ontario": {
-            "Toronto": (43.6532, -79.3832),
-            "Ottawa": (45.4215, -75.6972),
-            "Mississauga": (43.5890, -79.6441),
-            "Brampton": (43.7315, -79.7624),
-            "Hamilton": (43.2557, -79.8711),
-            "London": (42.9849, -81.2453),
-            "Windsor": (42.3149, -83.0364),
-            "Vaughan": (43.8563, -79.5085),
-            "Kitchener": (43.4516, -80.4925),
-            "Markham": (43.8561, -79.3370)
-        },
-        "Quebec": {
-            "Montreal": (45.5017, -73.5673),
-            "Quebec City": (46.8139, -71.2080),
-            "Laval": (45.6066, -73.7124),
-            "Gatineau": (45.4765, -75.7013),
-            "Longueuil": (45.5308, -73.5177),
-            "Sherbrooke": (45.4040, -71.8929),
-            "Saguenay": (48.4279, -71.0485),
-            "Levis": (46.7382, -71.2465),
-            "Trois-Rivieres": (46.3432, -72.5429),
-            "Terrebonne": (45.6929, -73.6331)
-        },
-        "British Columbia": {
-            "Vancouver": (49.2827, -123.1207),
-            "Victoria": (48.4284, -123.3656),
-            "Surrey": (49.1913, -122.8490),
-            "Burnaby": (49.2488, -122.9805),
-            "Richmond": (49.1666, -123.1336),
-            "Abbotsford": (49.0504, -122.3045),
-            "Coquitlam": (49.2838, -122.7932),
-            "Kelowna": (49.8880, -119.4960),
-            "Delta": (49.0847, -123.0587),
-            "Nanaimo": (49.1659, -123.9401)
-        }
-    },
-    "🇺🇸 United States": {
-        "California": {
-            "Los Angeles": (34.0522, -118.2437),
-            "San Francisco": (37.7749, -122.4194),
-            "San Diego": (32.7157, -117.1611),
-            "San Jose": (37.3382, -121.8863),
-            "Sacramento": (38.5816, -121.4944),
-            "Oakland": (37.8044, -122.2712),
-            "Long Beach": (33.7701, -118.1937),
-            "Anaheim": (33.8366, -117.9143),
-            "Santa Ana": (33.7455, -117.8677),
-            "Riverside": (33.9534, -117.3962)
-        },
-        "New York": {
-            "New York City": (40.7128, -74.0060),
-            "Buffalo": (42.8864, -78.8784),
-            "Rochester": (43.1566, -77.6088),
-            "Syracuse": (43.0481, -76.1474),
-            "Albany": (42.6526, -73.7562),
-            "Yonkers": (40.9312, -73.8987),
-            "Utica": (43.1009, -75.2327),
-            "White Plains": (41.0340, -73.7629),
-            "Binghamton": (42.0987, -75.9180),
-            "Poughkeepsie": (41.7004, -73.9210)
-        }
-    },
-    "🇬🇧 United Kingdom": {
-        "England": {
-            "London": (51.5074, -0.1278),
-            "Manchester": (53.4808, -2.2426),
-            "Birmingham": (52.4862, -1.8904),
-            "Liverpool": (53.4084, -2.9916),
-            "Leeds": (53.8008, -1.5491),
-            "Sheffield": (53.3811, -1.4701),
-            "Newcastle": (54.9783, -1.6178),
-            "Nottingham": (52.9548, -1.1581),
-            "Bristol": (51.4545, -2.5879),
-            "Leicester": (52.6369, -1.1398)
-        },
-        "Scotland": {
-            "Edinburgh": (55.9533, -3.1883),
-            "Glasgow": (55.8642, -4.2518),
-            "Aberdeen": (57.1497, -2.0943),
-            "Dundee": (56.4620, -2.9707),
-            "Inverness": (57.4778, -4.2247),
-            "Perth": (56.3950, -3.4308),
-            "Stirling": (56.1165, -3.9369),
-            "St Andrews": (56.3398, -2.7967),
-            "Falkirk": (56.0019, -3.7839),
-            "Ayr": (55.4589, -4.6292)
-        }
-    },
-    "🇮🇳 India": {
-        "Maharashtra": {
-            "Mumbai": (19.0760, 72.8777),
-            "Pune": (18.5204, 73.8567),
-            "Nagpur": (21.1458, 79.0882),
-            "Nashik": (19.9975, 73.7898),
-            "Aurangabad": (19.8762, 75.3433)
-        },
-        "Delhi": {
-            "New Delhi": (28.6139, 77.2090),
-            "North Delhi": (28.7041, 77.1025),
-            "South Delhi": (28.5244, 77.1855),
-            "East Delhi": (28.6280, 77.2789),
-            "West Delhi": (28.6663, 77.0665)
-        },
-        "Tamil Nadu": {
-            "Chennai": (13.0827, 80.2707),
-            "Coimbatore": (11.0168, 76.9558),
-            "Madurai": (9.9252, 78.1198),
-            "Salem": (11.6643, 78.1460),
-            "Tiruchirappalli": (10.7905, 78.7047)
-        }
-    },
-    "🇯🇵 Japan": {
-        "Kanto": {
-            "Tokyo": (35.6762, 139.6503),
-            "Yokohama": (35.4437, 139.6380),
-            "Saitama": (35.8616, 139.6455),
-            "Chiba": (35.6074, 140.1065),
-            "Kawasaki": (35.5308, 139.7029)
-        },
-        "Kansai": {
-            "Osaka": (34.6937, 135.5023),
-            "Kyoto": (35.0116, 135.7681),
-            "Kobe": (34.6901, 135.1955),
-            "Nara": (34.6851, 135.8048),
-            "Wakayama": (34.2305, 135.1708)
-        }
-    }
-}
 if 'share_image' not in st.session_state:
     st.session_state.share_image = None
 if 'location_name' not in st.session_state:
@@ -517,6 +380,8 @@ if 'latitude' not in st.session_state:
     st.session_state.latitude = None
 if 'longitude' not in st.session_state:
     st.session_state.longitude = None
+if 'grid_cell' not in st.session_state:
+    st.session_state.grid_cell = None
 if 'target_date' not in st.session_state:
     st.session_state.target_date = None
 if 'selected_activity' not in st.session_state:
@@ -532,603 +397,109 @@ if 'overall_risk' not in st.session_state:
     st.session_state.overall_risk = None
 if 'stats' not in st.session_state:
     st.session_state.stats = None
-# You can continue adding more countries following the same pattern:
-# "🇦🇺 Australia", "🇩🇪 Germany", "🇫🇷 France", "🇮🇹 Italy", etc.
-
-# -----------------------------
-# Activity Profiles
-# -----------------------------
-ACTIVITY_PROFILES = {
-    "Beach Day 🏖": {
-        "icon": "🏖",
-        "thresholds": {"temp_min": 22, "temp_max": 38, "rain": 2, "wind": 10},
-        "description": "Sunshine, warm temps, light winds"
-    },
-    "Hiking/Trail 🥾": {
-        "icon": "🥾",
-        "thresholds": {"temp_min": 5, "temp_max": 32, "rain": 5, "wind": 15},
-        "description": "Moderate temps, dry conditions"
-    },
-    "Picnic/BBQ 🧺": {
-        "icon": "🧺",
-        "thresholds": {"temp_min": 15, "temp_max": 35, "rain": 1, "wind": 12},
-        "description": "Pleasant weather, no rain"
-    },
-    "Parade/Festival 🎉": {
-        "icon": "🎉",
-        "thresholds": {"temp_min": 0, "temp_max": 35, "rain": 3, "wind": 15},
-        "description": "Comfortable for crowds"
-    },
-    "General Outdoor 🌳": {
-        "icon": "🌳",
-        "thresholds": {"temp_min": 10, "temp_max": 32, "rain": 3, "wind": 12},
-        "description": "Comfortable conditions"
-    }
-}
-
+if 'best_dates' not in st.session_state:
+    st.session_state.best_dates = None
+if 'comparison' not in st.session_state:
+    st.session_state.comparison = None
+if 'fetch_diagnostics' not in st.session_state:
+    st.session_state.fetch_diagnostics = None
+if 'analysis_fingerprint' not in st.session_state:
+    st.session_state.analysis_fingerprint = None
 # -----------------------------
 # Core Functions (Same as working version)
 # -----------------------------
-@st.cache_data(ttl=7200, show_spinner=False)
-def fetch_enhanced_weather_data(lat, lon, target_month, target_day, years_back=15):
-    """Fetch comprehensive weather data including humidity, snow, and air quality proxies"""
-    all_data = []
-    current_year = datetime.now().year
-    start_year = max(1981, current_year - years_back)
-    
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    successful_years = 0
-    
-    for idx, year in enumerate(range(start_year, current_year)):
-        try:
-            status_text.text(f"📡 Fetching enhanced data: {year} ({idx+1}/{current_year-start_year})")
-            
-            try:
-                center_date = datetime(year, target_month, target_day)
-            except ValueError:
-                if target_month == 2 and target_day == 29:
-                    center_date = datetime(year, 2, 28)
-                else:
-                    continue
-            
-            start_date = center_date - timedelta(days=5)
-            end_date = center_date + timedelta(days=5)
-            
-            # Enhanced parameters including humidity, cloud cover, and more
-            url = (f"https://power.larc.nasa.gov/api/temporal/daily/point?"
-                   f"parameters=T2M,T2M_MAX,T2M_MIN,PRECTOTCORR,WS2M,RH2M,CLOUD_AMT,QV2M,PS&"
-                   f"community=RE&longitude={lon}&latitude={lat}&"
-                   f"start={start_date.strftime('%Y%m%d')}&end={end_date.strftime('%Y%m%d')}&format=JSON")
-            
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            
-            if 'properties' not in data or 'parameter' not in data['properties']:
-                continue
-            
-            parameters = data['properties']['parameter']
-            
-            for date_str in parameters['T2M'].keys():
-                date_obj = datetime.strptime(date_str, "%Y%m%d")
-                
-                # Extract all available parameters
-                temp = parameters.get('T2M', {}).get(date_str)
-                temp_max = parameters.get('T2M_MAX', {}).get(date_str)
-                temp_min = parameters.get('T2M_MIN', {}).get(date_str)
-                precip = parameters.get('PRECTOTCORR', {}).get(date_str)
-                wind = parameters.get('WS2M', {}).get(date_str)
-                humidity = parameters.get('RH2M', {}).get(date_str)
-                cloud_cover = parameters.get('CLOUD_AMT', {}).get(date_str)
-                specific_humidity = parameters.get('QV2M', {}).get(date_str)
-                pressure = parameters.get('PS', {}).get(date_str)
-                
-                # Calculate heat index (feels-like temperature)
-                heat_index = None
-                if temp and humidity:
-                    if temp >= 27:  # Heat index only relevant at higher temps
-                        heat_index = calculate_heat_index(temp, humidity)
-                
-                if all(v not in [None, -999, -999.0] for v in [temp, temp_max, temp_min, precip, wind]):
-                    all_data.append({
-                        'year': year, 'date': date_obj, 'month': date_obj.month, 'day': date_obj.day,
-                        'temperature': float(temp), 'temp_max': float(temp_max), 'temp_min': float(temp_min),
-                        'precipitation': float(precip), 'wind_speed': float(wind),
-                        'humidity': float(humidity) if humidity not in [None, -999, -999.0] else None,
-                        'cloud_cover': float(cloud_cover) if cloud_cover not in [None, -999, -999.0] else None,
-                        'heat_index': heat_index,
-                        'pressure': float(pressure) if pressure not in [None, -999, -999.0] else None
-                    })
-            
-            successful_years += 1
-            progress_bar.progress((idx + 1) / (current_year - start_year))
-        except:
-            pass
-    
-    progress_bar.empty()
-    status_text.empty()
-    return pd.DataFrame(all_data)
-
-def calculate_heat_index(temp_c, humidity):
-    """Calculate heat index (feels-like temperature)"""
-    try:
-        # Convert to Fahrenheit for calculation
-        temp_f = temp_c * 9/5 + 32
-        
-        # Simplified heat index formula
-        hi = -42.379 + 2.04901523*temp_f + 10.14333127*humidity \
-             - 0.22475541*temp_f*humidity - 0.00683783*temp_f*temp_f \
-             - 0.05481717*humidity*humidity + 0.00122874*temp_f*temp_f*humidity \
-             + 0.00085282*temp_f*humidity*humidity - 0.00000199*temp_f*temp_f*humidity*humidity
-        
-        # Convert back to Celsius
-        hi_c = (hi - 32) * 5/9
-        return hi_c
-    except:
-        return None
-def create_interactive_map(lat, lon, location_name):
-    """Create an interactive map with location marker"""
-    import plotly.express as px
-    
-    df_map = pd.DataFrame({
-        'lat': [lat],
-        'lon': [lon],
-        'location': [location_name]
-    })
-    
-    fig = px.scatter_mapbox(
-        df_map, 
-        lat='lat', 
-        lon='lon',
-        hover_name='location',
-        zoom=8,
-        height=400,
-        color_discrete_sequence=['#00d4ff']
-    )
-    
-    fig.update_layout(
-        mapbox_style="open-street-map",
-        margin={"r":0,"t":0,"l":0,"b":0},
-        paper_bgcolor="rgba(0,0,0,0)",
-        font={'color': "#ffffff"}
-    )
-    
-    return fig
-
-def calculate_enhanced_weather_risks(df, target_month, target_day, thresholds):
-    """Enhanced risk calculation including humidity and heat index"""
-    df_filtered = df[(df['month'] == target_month) & (abs(df['day'] - target_day) <= 3)].copy()
-    
-    if len(df_filtered) < 10:
-        return None
-    
-    total_days = len(df_filtered)
-    
-    risks = {
-        'too_cold': (df_filtered['temp_min'] < thresholds['temp_min']).sum() / total_days * 100,
-        'too_hot': (df_filtered['temp_max'] > thresholds['temp_max']).sum() / total_days * 100,
-        'rainy': (df_filtered['precipitation'] >= thresholds['rain']).sum() / total_days * 100,
-        'windy': (df_filtered['wind_speed'] >= thresholds['wind']).sum() / total_days * 100
-    }
-    
-    # Add humidity risk if available
-    if 'humidity' in df_filtered.columns and df_filtered['humidity'].notna().sum() > 10:
-        risks['high_humidity'] = (df_filtered['humidity'] > 80).sum() / total_days * 100
-    
-    # Add uncomfortable heat index risk
-    if 'heat_index' in df_filtered.columns and df_filtered['heat_index'].notna().sum() > 10:
-        risks['uncomfortable_heat'] = (df_filtered['heat_index'] > 35).sum() / total_days * 100
-    
-    bad_weather_days = (
-        (df_filtered['temp_min'] < thresholds['temp_min']) |
-        (df_filtered['temp_max'] > thresholds['temp_max']) |
-        (df_filtered['precipitation'] >= thresholds['rain']) |
-        (df_filtered['wind_speed'] >= thresholds['wind'])
-    ).sum()
-    
-    overall_risk = (bad_weather_days / total_days) * 100
-    
-    stats = {
-        'avg_temp': df_filtered['temperature'].mean(),
-        'typical_high': df_filtered['temp_max'].median(),
-        'typical_low': df_filtered['temp_min'].median(),
-        'max_temp_ever': df_filtered['temp_max'].max(),
-        'min_temp_ever': df_filtered['temp_min'].min(),
-        'avg_precip': df_filtered['precipitation'].mean(),
-        'max_precip_ever': df_filtered['precipitation'].max(),
-        'avg_wind': df_filtered['wind_speed'].mean(),
-        'max_wind_ever': df_filtered['wind_speed'].max(),
-        'rainy_days': (df_filtered['precipitation'] >= 1.0).sum(),
-        'total_days': total_days,
-        'years_analyzed': df_filtered['year'].nunique(),
-        'avg_humidity': df_filtered['humidity'].mean() if 'humidity' in df_filtered.columns else None,
-        'avg_cloud_cover': df_filtered['cloud_cover'].mean() if 'cloud_cover' in df_filtered.columns else None
-    }
-    
-    return risks, overall_risk, stats, df_filtered
-
-def create_risk_gauge(overall_risk):
-    if overall_risk < 20:
-        color, status = "#00ff64", "MISSION GO 🚀"
-    elif overall_risk < 40:
-        color, status = "#00d4ff", "NOMINAL ✅"
-    elif overall_risk < 60:
-        color, status = "#ffa500", "CAUTION ⚠"
-    else:
-        color, status = "#ff0080", "HIGH RISK ❌"
-    
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=overall_risk,
-        title={'text': f"🛰 {status}", 'font': {'size': 24, 'color': color, 'family': "Orbitron"}},
-        number={'suffix': "%", 'font': {'size': 48, 'color': color}},
-        gauge={
-            'axis': {'range': [0, 100], 'tickcolor': "#00d4ff"},
-            'bar': {'color': color},
-            'steps': [
-                {'range': [0, 20], 'color': 'rgba(0, 255, 100, 0.3)'},
-                {'range': [20, 40], 'color': 'rgba(0, 212, 255, 0.3)'},
-                {'range': [40, 60], 'color': 'rgba(255, 165, 0, 0.3)'},
-                {'range': [60, 100], 'color': 'rgba(255, 0, 128, 0.3)'}
-            ]
-        }
-    ))
-    
-    fig.update_layout(
-        height=350,
-        paper_bgcolor="rgba(0,0,0,0)",
-        font={'color': "#ffffff"},
-        margin=dict(t=50, b=50, l=50, r=50),  # Responsive margins
-        autosize=True  # Make plot responsive
-    )
-    return fig
-
-def create_risk_breakdown(risks):
-    labels = ['❄ COLD', '🔥 HEAT', '🌧 RAIN', '💨 WIND']
-    values = [risks['too_cold'], risks['too_hot'], risks['rainy'], risks['windy']]
-    
-    fig = go.Figure(go.Bar(
-        x=labels, y=values,
-        text=[f'{v:.1f}%' for v in values],
-        textposition='outside',
-        marker_color=['#00d4ff', '#ff0080', '#00ff64', '#ffa500']
-    ))
-    
-    fig.update_layout(
-        title={'text': '🛰 THREAT ASSESSMENT', 'font': {'color': '#00d4ff', 'family': "Orbitron"}},
-        yaxis={'gridcolor': 'rgba(0, 212, 255, 0.2)'},
-        height=400,
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font={'color': "#ffffff"}
-    )
-    return fig
-def create_weather_trend_analysis(df_filtered, variable='temperature'):
-    """Create comprehensive trend analysis with regression"""
-    fig = go.Figure()
-    
-    # Group by year and calculate mean
-    yearly_data = df_filtered.groupby('year')[variable].mean().reset_index()
-    
-    # Add scatter plot
-    fig.add_trace(go.Scatter(
-        x=yearly_data['year'],
-        y=yearly_data[variable],
-        mode='markers',
-        name='Yearly Average',
-        marker=dict(size=10, color='#00d4ff')
-    ))
-    
-    # Add trend line
-    if len(yearly_data) > 2:
-        z = np.polyfit(yearly_data['year'], yearly_data[variable], 1)
-        p = np.poly1d(z)
-        
-        fig.add_trace(go.Scatter(
-            x=yearly_data['year'],
-            y=p(yearly_data['year']),
-            mode='lines',
-            name=f'Trend (slope: {z[0]:.3f}°C/year)',
-            line=dict(color='#ff0080', width=3, dash='dash')
-        ))
-    
-    # Add moving average
-    if len(yearly_data) >= 3:
-        yearly_data['ma'] = yearly_data[variable].rolling(window=3, center=True).mean()
-        fig.add_trace(go.Scatter(
-            x=yearly_data['year'],
-            y=yearly_data['ma'],
-            mode='lines',
-            name='3-Year Moving Average',
-            line=dict(color='#00ff64', width=2)
-        ))
-    
-    fig.update_layout(
-        title=f'🔮 Long-term {variable.replace("_", " ").title()} Trend',
-        xaxis_title='Year',
-        yaxis_title=f'{variable.replace("_", " ").title()}',
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font={'color': "#ffffff"},
-        hovermode='x unified',
-        height=450
-    )
-    
-    return fig
-def create_probability_curve(df_filtered, variable, thresholds):
-    """Create probability distribution with bell curve"""
-    data = df_filtered[variable].dropna()
-    
-    if len(data) < 10:
-        return None
-    
-    fig = go.Figure()
-    
-    # Histogram
-    fig.add_trace(go.Histogram(
-        x=data,
-        nbinsx=30,
-        name="Observed Frequency",
-        marker_color='#00d4ff',
-        opacity=0.7,
-        histnorm='probability density'
-    ))
-    
-    # Fit normal distribution
-    mu = data.mean()
-    sigma = data.std()
-    x_range = np.linspace(data.min(), data.max(), 100)
-    y_fit = scipy_stats.norm.pdf(x_range, mu, sigma)
-    
-    fig.add_trace(go.Scatter(
-        x=x_range,
-        y=y_fit,
-        mode='lines',
-        name='Normal Distribution Fit',
-        line=dict(color='#ff0080', width=3)
-    ))
-    
-    # Add threshold markers
-    if variable == 'temperature' and 'temp_max' in thresholds:
-        fig.add_vline(
-            x=thresholds['temp_max'],
-            line_dash="dash",
-            line_color="#ff0080",
-            annotation_text=f"Too Hot: {thresholds['temp_max']}°C"
-        )
-    elif variable == 'precipitation' and 'rain' in thresholds:
-        fig.add_vline(
-            x=thresholds['rain'],
-            line_dash="dash",
-            line_color="#00ff64",
-            annotation_text=f"Rain Threshold: {thresholds['rain']}mm"
-        )
-    
-    fig.update_layout(
-        title=f'📊 Probability Distribution - {variable.replace("_", " ").title()}',
-        xaxis_title=variable.replace("_", " ").title(),
-        yaxis_title='Probability Density',
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font={'color': "#ffffff"},
-        height=400,
-        showlegend=True
-    )
-    
-    return fig
-def calculate_confidence_score(stats):
-    years = stats['years_analyzed']
-    days = stats['total_days']
-    
-    if years >= 10 and days >= 50:
-        return "HIGH ✅", "#00ff64"
-    elif years >= 5 and days >= 25:
-        return "MEDIUM ⚠", "#ffa500"
-    else:
-        return "LOW ❌", "#ff0080"
-    
-def prepare_data_with_metadata(df, location, date):
-    """Add metadata to downloaded data"""
-    metadata = {
-        "data_source": "NASA POWER API",
-        "location": location,
-        "coordinates": f"Lat: {latitude}, Lon: {longitude}",
-        "date_generated": datetime.now().strftime("%Y-%m-%d"),
-        "units": {
-            "temperature": "Celsius",
-            "precipitation": "mm",
-            "wind_speed": "m/s"
-        },
-        "data_variables": list(df.columns),
-        "analysis_date": date.strftime("%Y-%m-%d")
-    }
-    
-    if format_choice == "JSON":
-        data = {
-            "metadata": metadata,
-            "data": json.loads(df.to_json(orient="records"))
-        }
-        return json.dumps(data)
-    else:
-        metadata_str = "\n".join([f"# {k}: {v}" for k, v in metadata.items()])
-        return f"{metadata_str}\n\n{df.to_csv(index=False)}"
+@st.cache_resource(show_spinner=False)
+def get_history_store():
+    """Shared on-disk POWER history, survives restarts and is reused by every session"""
+    return HistoryStore()
+
+@st.cache_resource(show_spinner=False)
+def get_climatology():
+    """Precomputed preset city climatology (built by build_climatology.py), None if not shipped"""
+    return load_climatology()
+
+@st.cache_resource(show_spinner=False)
+def get_figure_cache():
+    """Built chart figures shared by every session, so reruns only rebuild panels whose inputs changed"""
+    return FigureCache()
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def load_location_daily_history(lat, lon, years_back, version):
+    """Stored history for a cell, cached until the store version changes"""
+    return load_location_history(lat, lon, get_history_store(), years_back=years_back)
+
+def fetch_location_daily_history(lat, lon, years_back=15, max_workers=MAX_CONCURRENT_REQUESTS):
+    """Full daily history for a location, cached independently of the target date
+    
+    Only the missing or provisional tail is downloaded, the rest comes from disk.
+    """
+    with streamlit_progress("📡 Fetching enhanced data") as on_progress:
+        version = sync_location_history(lat, lon, get_history_store(), years_back=years_back,
+                                        max_workers=max_workers, progress_callback=on_progress)
+    return load_location_daily_history(lat, lon, years_back, version)
+
+def fetch_comparison_histories(cells, years_back=15):
+    """Histories for several grid cells fetched side by side, keyed by cell"""
+    report = FetchReport()
+    with streamlit_progress("📡 Fetched") as on_progress:
+        versions = sync_location_histories(cells, get_history_store(), years_back=years_back,
+                                           progress_callback=on_progress, report=report)
+    report.log("comparison")
+    return {cell: load_location_daily_history(cell[0], cell[1], years_back, versions.get(cell)) for cell in cells}
+
+def analyze_location(lat, lon, target_date, thresholds, years_back=15):
+    """Run the launch analysis with a progress bar, reusing the cached location history
+    
+    A new target date at the same location needs no refetch. See
+    analysis.run_analysis for the result.
+    """
+    with streamlit_progress("📡 Fetching enhanced data") as on_progress:
+        return run_analysis(lat, lon, target_date, thresholds, get_history_store(), years_back=years_back,
+                            progress_callback=on_progress, load_history=load_location_daily_history)
+
+def export_cell_history(store, grid_cell, years_back, format_choice, location_name, target_date):
+    """The grid cell's full stored daily history as an export file, streamed from the store a few years at a time"""
+    frames = iter_location_history(*grid_cell, store, years_back=years_back)
+    first = next(frames, pd.DataFrame())
+    metadata = export_metadata(first.columns, location_name, target_date, grid_cell[0], grid_cell[1], grid_cell)
+    return export_file(chain([first], frames), format_choice, metadata)
+
+def render_fetch_diagnostics(diagnostics):
+    """Expander with the request totals and per-year coverage of the last fetch"""
+    summary = diagnostics['summary']
+    years = diagnostics['years']
+    incomplete = years[years['status'] != 'ok']
+    
+    with st.expander(f"📡 Fetch diagnostics ({len(years) - len(incomplete)}/{len(years)} years complete)"):
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Requests", summary['requests'], f"{summary['failed']} failed" if summary['failed'] else None,
+                    delta_color="inverse")
+        col2.metric("Retries", summary['retries'])
+        col3.metric("Median latency", f"{summary['latency_p50']:.2f}s" if summary['latency_p50'] is not None else "—")
+        col4.metric("Received", f"{summary['bytes'] / 1024:.0f} KB")
+        st.caption(f"💾 Store hits: {summary['cache_hits']} range(s) · Network fetches: {summary['cache_misses']}"
+                   f" ({summary['shared']} shared with other sessions)")
+        st.dataframe(years, use_container_width=True, hide_index=True)
+        if not diagnostics['requests'].empty:
+            st.dataframe(diagnostics['requests'], use_container_width=True, hide_index=True)
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def render_share_png(location_name, target_date, selected_activity, overall_risk, stats, risks):
+    """Report card PNG, rendered once per analysis and shared by every session"""
+    return render_share_image(location_name, target_date, selected_activity, overall_risk, stats, risks)
 
 def create_shareable_image(location_name, target_date, selected_activity, overall_risk, stats, risks):
     """Create a shareable image with analysis results"""
     try:
-        # Create combined figure for sharing with better formatting
-        share_fig = go.Figure()
-        
-        # Add a simple background
-        share_fig.add_trace(go.Scatter(
-            x=[0, 1], y=[0, 1],
-            mode='markers',
-            marker=dict(size=1, color='rgba(0,0,0,0)'),
-            showlegend=False
-        ))
-        
-        # Layout with improved styling and proper margins
-        share_fig.update_layout(
-            title={
-                'text': "🛡 PARADE GUARDS: Weather Intelligence Report",
-                'y':0.95,
-                'x':0.5,
-                'xanchor': 'center',
-                'yanchor': 'top',
-                'font': {'size': 28, 'color': '#00d4ff', 'family': "Orbitron"}
-            },
-            paper_bgcolor="rgba(0,0,0,0.95)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            font={'color': "#ffffff", 'family': "Arial"},
-            height=900,
-            width=1200,
-            showlegend=False,
-            margin=dict(l=50, r=50, t=100, b=50),  # Proper margins
-            annotations=[
-                # Header with better spacing
-                dict(
-                    text=f"📍 LOCATION: {location_name}",
-                    x=0.5, y=0.88,
-                    showarrow=False,
-                    font={'size': 20, 'color': '#00d4ff', 'family': "Arial"},
-                    xanchor='center'
-                ),
-                dict(
-                    text=f"📅 DATE: {target_date.strftime('%B %d, %Y')}",
-                    x=0.5, y=0.84,
-                    showarrow=False,
-                    font={'size': 18, 'color': '#ffffff', 'family': "Arial"},
-                    xanchor='center'
-                ),
-                # Activity with better formatting
-                dict(
-                    text=f"🎯 ACTIVITY: {selected_activity}",
-                    x=0.5, y=0.78,
-                    showarrow=False,
-                    font={'size': 18, 'color': '#00ff64', 'family': "Arial"},
-                    xanchor='center'
-                ),
-                # Risk Score with emphasis
-                dict(
-                    text=f"⚠ RISK ASSESSMENT: {overall_risk:.1f}%",
-                    x=0.5, y=0.70,
-                    showarrow=False,
-                    font={'size': 24, 'color': '#ff0080', 'family': "Arial", 'weight': 'bold'},
-                    xanchor='center'
-                ),
-                # Weather Stats with better layout
-                dict(
-                    text=f"🌡 TEMPERATURE: {stats['typical_low']:.1f}°C to {stats['typical_high']:.1f}°C",
-                    x=0.5, y=0.62,
-                    showarrow=False,
-                    font={'size': 16, 'color': '#00d4ff', 'family': "Arial"},
-                    xanchor='center'
-                ),
-                dict(
-                    text=f"🌧 RAIN RISK: {risks['rainy']:.1f}%",
-                    x=0.5, y=0.58,
-                    showarrow=False,
-                    font={'size': 16, 'color': '#00d4ff', 'family': "Arial"},
-                    xanchor='center'
-                ),
-                dict(
-                    text=f"💨 WIND RISK: {risks['windy']:.1f}%",
-                    x=0.5, y=0.54,
-                    showarrow=False,
-                    font={'size': 16, 'color': '#00d4ff', 'family': "Arial"},
-                    xanchor='center'
-                ),
-                # Additional stats
-                dict(
-                    text=f"📊 DATA: {stats['years_analyzed']} years analyzed ({stats['total_days']} days)",
-                    x=0.5, y=0.46,
-                    showarrow=False,
-                    font={'size': 14, 'color': '#ffffff', 'family': "Arial"},
-                    xanchor='center'
-                ),
-                # Footer with proper spacing
-                dict(
-                    text="Generated by Parade Guards Weather Intelligence System",
-                    x=0.5, y=0.15,
-                    showarrow=False,
-                    font={'size': 14, 'color': '#ffffff', 'family': "Arial"},
-                    xanchor='center'
-                ),
-                dict(
-                    text="Data Source: NASA POWER API | 🛡 Weather Protection Active",
-                    x=0.5, y=0.10,
-                    showarrow=False,
-                    font={'size': 12, 'color': '#00d4ff', 'family': "Arial"},
-                    xanchor='center'
-                )
-            ],
-            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False)
-        )
-        
-        # # Convert to image with high quality
-        # img_bytes = pio.to_image(share_fig, format="png", width=1200, height=900, scale=2)
-        # return img_bytes
-        st.plotly_chart(share_fig)
-
+        return render_share_png(location_name, target_date, selected_activity, overall_risk, stats, risks)
     except Exception as e:
         st.error(f"Error creating shareable image: {str(e)}")
         return None
 
-# Add this after your analysis section, before the footer:
-def create_temperature_distribution(df_filtered):
-    """Create temperature distribution plot"""
-    try:
-        data = df_filtered['temperature'].dropna()
-        
-        fig = go.Figure()
-        
-        # Add histogram
-        fig.add_trace(go.Histogram(
-            x=data,
-            nbinsx=30,
-            name="Temperature Distribution",
-            marker_color="#ff0080",
-            opacity=0.7
-        ))
-
-        # Add mean line
-        mean_value = data.mean()
-        fig.add_vline(
-            x=mean_value,
-            line_dash="dash",
-            line_color="white",
-            annotation_text=f"Mean: {mean_value:.1f}°C",
-            annotation_position="top"
-        )
-
-        # Update layout
-        fig.update_layout(
-        height=500,
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font={'color': "#ffffff"},
-        margin=dict(t=50, b=50, l=50, r=50),
-        autosize=True,
-        xaxis={'automargin': True},
-        yaxis={'automargin': True}
-    )
-        return fig
-
-    except Exception as e:
-        st.error(f"Error creating temperature plot: {str(e)}")
-        return None
-
 # -----------------------------
-# Load logo as base64
+# Logo, downsized once per process (see static_assets.py)
 # -----------------------------
-try:
-    with open("2.png", "rb") as f:
-        logo_bytes = f.read()
-    logo_data_uri = f"data:image/png;base64,{base64.b64encode(logo_bytes).decode()}"
-except FileNotFoundError:
-    logo_data_uri = "2.png"
+logo_image_src = logo_src(st.get_option("server.enableStaticServing"))
 # -----------------------------
 # Responsive Header
 # -----------------------------
@@ -1251,7 +622,7 @@ st.markdown(f"""
 <div class="header-container">
     <div class="header-content">
         <div class="logo-container">
-            <img src="{logo_data_uri}" class="logo-image" alt="Parade Guards Logo">
+            <img src="{logo_image_src}" class="logo-image" alt="Parade Guards Logo">
         </div>
         <div class="title-container">
             <div class="main-title">PARADE GUARDS</div>
@@ -1332,7 +703,8 @@ else:
 st.info(f"📍 SECURED:** {location_name} | LAT: {latitude:.4f}° LON: {longitude:.4f}°")
 # Show location on map
 with st.expander("🗺 View Location on Map"):
-   st.plotly_chart(create_interactive_map(latitude, longitude, location_name), use_container_width=True)
+   st.plotly_chart(get_figure_cache().get((latitude, longitude, location_name), create_interactive_map,
+                                          latitude, longitude, location_name), use_container_width=True)
 st.markdown('</div>', unsafe_allow_html=True)
 
 # Date Selection
@@ -1364,38 +736,226 @@ for idx, (activity, profile) in enumerate(ACTIVITY_PROFILES.items()):
 
 selected_activity = st.session_state.activity
 st.success(f"ACTIVE: {selected_activity} - {ACTIVITY_PROFILES[selected_activity]['description']}")
+
+# Preset cities are answered instantly from the shipped climatology, no API calls
+if selected_city != "🛰 Custom":
+    quick = climatology_risks(get_climatology(), *snap_to_grid(latitude, longitude),
+                              target_date.month, target_date.day,
+                              ACTIVITY_PROFILES[selected_activity]['thresholds'])
+    if quick is not None:
+        quick_risks, quick_overall, quick_stats = quick
+        st.markdown("#### 📚 INSTANT CLIMATOLOGY")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("⚠ Overall Risk", f"{quick_overall:.0f}%")
+        with col2:
+            st.metric("🌧 Rain Risk", f"{quick_risks['rainy']:.0f}%")
+        with col3:
+            st.metric("🌡 Typical Range", f"{quick_stats['typical_low']:.0f}–{quick_stats['typical_high']:.0f}°C")
+        with col4:
+            st.metric("📊 History", f"{quick_stats['years_analyzed']} years")
+st.markdown('</div>', unsafe_allow_html=True)
+
+# Best Day Finder
+st.markdown('<div class="mission-panel"><div class="panel-title">🔎 FIND THE BEST DAY</div>', unsafe_allow_html=True)
+
+search_range = st.date_input(
+    "🗓 SEARCH WINDOW",
+    value=(datetime.now().date(), (datetime.now() + timedelta(days=60)).date()),
+    min_value=datetime.now(),
+    max_value=datetime.now() + timedelta(days=365),
+    key="best_day_range"
+)
+
+if st.button("🔎 FIND BEST DAYS", use_container_width=True):
+    if len(search_range) != 2:
+        st.warning("⚠ Select both a start and an end date")
+    else:
+        grid_cell = snap_to_grid(latitude, longitude)
+        thresholds = ACTIVITY_PROFILES[selected_activity]['thresholds']
+        calendar = None
+        if selected_city != "🛰 Custom":
+            calendar = climatology_calendar(get_climatology(), grid_cell[0], grid_cell[1], thresholds)
+        
+        if calendar is not None:
+            ranked = rank_dates(calendar, search_range[0], search_range[1])
+        else:
+            with st.spinner(f"🛰 Scanning every day for {location_name}..."):
+                history = fetch_location_daily_history(grid_cell[0], grid_cell[1])
+            # One pass over the cached history scores every day in the range
+            ranked = None if history.empty else find_best_dates(history, thresholds, search_range[0],
+                                                                search_range[1], years=analysis_years())
+        
+        if ranked is None:
+            st.error("❌ DATA UNAVAILABLE")
+            st.session_state.best_dates = None
+        else:
+            st.session_state.best_dates = {
+                "ranked": ranked,
+                "location_name": location_name,
+                "activity": selected_activity
+            }
+
+if st.session_state.best_dates is not None:
+    best = st.session_state.best_dates
+    ranked = best["ranked"]
+    if ranked.empty:
+        st.error("❌ INSUFFICIENT DATA")
+    else:
+        top = ranked.iloc[0]
+        st.success(f"🏆 Best day for {best['activity']} in {best['location_name']}: "
+                   f"{top['date'].strftime('%A, %B %d, %Y')} ({top['overall_risk']:.1f}% risk)")
+        
+        by_date = ranked.sort_values('date')
+        best_fig = go.Figure(go.Scatter(
+            x=by_date['date'], y=by_date['overall_risk'],
+            mode='lines+markers', line=dict(color='#00d4ff'), name='Overall Risk'
+        ))
+        best_fig.add_trace(go.Scatter(
+            x=ranked['date'].head(5), y=ranked['overall_risk'].head(5),
+            mode='markers', marker=dict(size=14, color='#00ff64', symbol='star'), name='Top 5'
+        ))
+        best_fig.update_layout(
+            yaxis_title='Overall Risk %',
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+            font={'color': "#ffffff"},
+            height=350
+        )
+        st.plotly_chart(best_fig, use_container_width=True, key="best_days_chart")
+        
+        top_days = ranked.head(10)[['date', 'overall_risk', 'too_cold', 'too_hot', 'rainy', 'windy']].copy()
+        top_days['date'] = top_days['date'].dt.strftime('%a %Y-%m-%d')
+        st.dataframe(
+            top_days.rename(columns={'date': 'Date', 'overall_risk': 'Overall %', 'too_cold': 'Cold %',
+                                     'too_hot': 'Heat %', 'rainy': 'Rain %', 'windy': 'Wind %'}).round(1),
+            use_container_width=True, hide_index=True
+        )
+
+st.markdown('</div>', unsafe_allow_html=True)
+
+# Location Comparison
+st.markdown('<div class="mission-panel"><div class="panel-title">🌍 COMPARE LOCATIONS</div>', unsafe_allow_html=True)
+
+city_options = {
+    f"{city}, {region}": coords
+    for regions in LOCATIONS.values()
+    for region, region_cities in regions.items()
+    for city, coords in region_cities.items()
+}
+compare_cities = st.multiselect(
+    "🏙 CANDIDATE CITIES",
+    list(city_options.keys()),
+    default=[location_name] if location_name in city_options else [],
+    key="compare_cities"
+)
+compare_custom = st.text_area(
+    "🛰 CUSTOM COORDINATES (one 'lat, lon' per line)",
+    key="compare_custom",
+    height=80
+)
+
+if st.button("🌍 COMPARE LOCATIONS", use_container_width=True):
+    candidates = {name: city_options[name] for name in compare_cities}
+    for line in compare_custom.splitlines():
+        try:
+            lat_str, lon_str = line.split(",")
+            lat_val, lon_val = float(lat_str), float(lon_str)
+            candidates[f"{lat_val:.3f}°, {lon_val:.3f}°"] = (lat_val, lon_val)
+        except ValueError:
+            if line.strip():
+                st.warning(f"⚠ Skipping unreadable coordinates: {line}")
+    
+    if not candidates:
+        st.warning("⚠ Pick at least one city or enter coordinates")
+    else:
+        cells = {name: snap_to_grid(lat, lon) for name, (lat, lon) in candidates.items()}
+        with st.spinner(f"🛰 Comparing {len(candidates)} locations for {target_date.strftime('%B %d')}..."):
+            histories = fetch_comparison_histories(tuple(sorted(set(cells.values()))))
+        
+        windows = {
+            name: extract_date_windows(histories[cell], target_date.month, target_date.day)
+            for name, cell in cells.items()
+        }
+        st.session_state.comparison = {
+            "ranked": compare_locations(windows, target_date.month, target_date.day,
+                                        ACTIVITY_PROFILES[selected_activity]['thresholds']),
+            "target_date": target_date,
+            "activity": selected_activity
+        }
+
+if st.session_state.comparison is not None:
+    comparison = st.session_state.comparison
+    ranked = comparison["ranked"]
+    if ranked.empty:
+        st.error("❌ INSUFFICIENT DATA")
+    else:
+        st.success(f"🏆 Best location for {comparison['activity']} on "
+                   f"{comparison['target_date'].strftime('%B %d, %Y')}: "
+                   f"{ranked['location'].iloc[0]} ({ranked['overall_risk'].iloc[0]:.1f}% risk)")
+        
+        compare_fig = go.Figure()
+        for column, label, color in [('too_cold', '❄ COLD', '#00d4ff'), ('too_hot', '🔥 HEAT', '#ff0080'),
+                                     ('rainy', '🌧 RAIN', '#00ff64'), ('windy', '💨 WIND', '#ffa500')]:
+            compare_fig.add_trace(go.Bar(x=ranked['location'], y=ranked[column], name=label, marker_color=color))
+        compare_fig.add_trace(go.Scatter(
+            x=ranked['location'], y=ranked['overall_risk'], name='OVERALL',
+            mode='markers', marker=dict(size=16, color='#ffffff', symbol='diamond')
+        ))
+        compare_fig.update_layout(
+            barmode='group',
+            yaxis_title='Risk %',
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+            font={'color': "#ffffff"},
+            height=400
+        )
+        st.plotly_chart(compare_fig, use_container_width=True, key="compare_chart")
+        
+        st.dataframe(
+            ranked.rename(columns={'location': 'Location', 'overall_risk': 'Overall %', 'too_cold': 'Cold %',
+                                   'too_hot': 'Heat %', 'rainy': 'Rain %', 'windy': 'Wind %',
+                                   'typical_high': 'High °C', 'typical_low': 'Low °C',
+                                   'years_analyzed': 'Years', 'total_days': 'Days'}).round(1),
+            use_container_width=True, hide_index=True
+        )
+
 st.markdown('</div>', unsafe_allow_html=True)
 
 # Launch Button
 # Launch Button
 if st.button("🛡 LAUNCH PROTECTION ANALYSIS", type="primary", use_container_width=True):
     
+    # Snap to the POWER grid cell first so nearby points share one cache entry
+    grid_cell = snap_to_grid(latitude, longitude)
+    
     with st.spinner(f"🛰 Analyzing 15 years of enhanced data for {location_name}..."):
-        df = fetch_enhanced_weather_data(latitude, longitude, target_date.month, target_date.day)
+        analysis = analyze_location(grid_cell[0], grid_cell[1], target_date, ACTIVITY_PROFILES[selected_activity]['thresholds'])
+    st.session_state.fetch_diagnostics = analysis['diagnostics']
     
-    if df.empty:
+    if analysis['windows'].empty:
         st.error("❌ DATA UNAVAILABLE")
+        render_fetch_diagnostics(analysis['diagnostics'])
+        st.session_state.analysis_complete = False
+    elif analysis['risks'] is None:
+        st.error("❌ INSUFFICIENT DATA")
+        render_fetch_diagnostics(analysis['diagnostics'])
         st.session_state.analysis_complete = False
     else:
-        result = calculate_enhanced_weather_risks(df, target_date.month, target_date.day, ACTIVITY_PROFILES[selected_activity]['thresholds'])
-        
-        if result is None:
-            st.error("❌ INSUFFICIENT DATA")
-            st.session_state.analysis_complete = False
-        else:
-            risks, overall_risk, stats, df_filtered = result
-            
-            # ONLY store in session state - NO display here!
-            st.session_state.analysis_complete = True
-            st.session_state.df_filtered = df_filtered
-            st.session_state.risks = risks
-            st.session_state.overall_risk = overall_risk
-            st.session_state.stats = stats
-            st.session_state.location_name = location_name
-            st.session_state.latitude = latitude
-            st.session_state.longitude = longitude
-            st.session_state.target_date = target_date
-            st.session_state.selected_activity = selected_activity
+        # ONLY store in session state - NO display here!
+        st.session_state.analysis_complete = True
+        st.session_state.df_filtered = analysis['df_filtered']
+        st.session_state.risks = analysis['risks']
+        st.session_state.overall_risk = analysis['overall_risk']
+        st.session_state.stats = analysis['stats']
+        # Identifies this analysis' chart inputs, computed once instead of hashing them on every rerun
+        st.session_state.analysis_fingerprint = fingerprint(analysis['df_filtered'], analysis['risks'])
+        st.session_state.location_name = location_name
+        st.session_state.latitude = latitude
+        st.session_state.longitude = longitude
+        st.session_state.grid_cell = grid_cell
+        st.session_state.target_date = target_date
+        st.session_state.selected_activity = selected_activity
 
 # NOW display results OUTSIDE the button
 if st.session_state.analysis_complete:
@@ -1407,14 +967,26 @@ if st.session_state.analysis_complete:
     location_name = st.session_state.location_name
     latitude = st.session_state.latitude
     longitude = st.session_state.longitude
+    grid_cell = st.session_state.grid_cell
     target_date = st.session_state.target_date
     selected_activity = st.session_state.selected_activity
+    analysis_fingerprint = st.session_state.analysis_fingerprint
+    figure_cache = get_figure_cache()
     
     st.success(f"✅ ANALYSIS COMPLETE: {stats['years_analyzed']} years ({stats['total_days']} days)")
+    st.caption(f"🛰 NASA POWER grid cell: LAT {grid_cell[0]:.3f}° LON {grid_cell[1]:.3f}° (0.5° × 0.625°)")
+    if st.session_state.fetch_diagnostics is not None:
+        year_status = st.session_state.fetch_diagnostics['years']
+        incomplete = year_status[year_status['status'] != 'ok']
+        if not incomplete.empty:
+            st.warning(f"⚠️ {len(incomplete)} of {len(year_status)} years are incomplete, see fetch diagnostics below")
+        render_fetch_diagnostics(st.session_state.fetch_diagnostics)
     
     # Add Interactive Map
     st.markdown('<div class="mission-panel"><div class="panel-title">🗺 TARGET LOCATION</div>', unsafe_allow_html=True)
-    st.plotly_chart(create_interactive_map(latitude, longitude, location_name), use_container_width=True, key="analysis_map")
+    st.plotly_chart(figure_cache.get((latitude, longitude, location_name), create_interactive_map,
+                                     latitude, longitude, location_name),
+                    use_container_width=True, key="analysis_map")
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Intelligence Assessment
@@ -1423,10 +995,12 @@ if st.session_state.analysis_complete:
     col1, col2 = st.columns([1, 1.2])
     
     with col1:
-        st.plotly_chart(create_risk_gauge(overall_risk), use_container_width=True, key="risk_gauge_main")
+        st.plotly_chart(figure_cache.get(overall_risk, create_risk_gauge, overall_risk),
+                        use_container_width=True, key="risk_gauge_main")
     
     with col2:
-        st.plotly_chart(create_risk_breakdown(risks), use_container_width=True, key="risk_breakdown_main")
+        st.plotly_chart(figure_cache.get(analysis_fingerprint, create_risk_breakdown, risks),
+                        use_container_width=True, key="risk_breakdown_main")
     
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -1447,6 +1021,40 @@ if st.session_state.analysis_complete:
         else:
             st.metric("☁️ Cloud", f"{stats['avg_cloud_cover']:.0f}%" if stats['avg_cloud_cover'] else "N/A", "Cover")
     
+    # ACTIVITY SUITABILITY - every profile scored against the same window in one pass
+    st.markdown("---")
+    st.markdown('<div class="mission-panel"><div class="panel-title">🎯 ACTIVITY SUITABILITY</div>', unsafe_allow_html=True)
+    
+    profiles_to_score = dict(ACTIVITY_PROFILES)
+    with st.expander("➕ Add a custom activity profile"):
+        custom_name = st.text_input("Profile name", key="custom_profile_name")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            custom_temp_min = st.number_input("Min temp (°C)", value=10, key="custom_temp_min")
+        with col2:
+            custom_temp_max = st.number_input("Max temp (°C)", value=30, key="custom_temp_max")
+        with col3:
+            custom_rain = st.number_input("Rain (mm)", value=3.0, key="custom_rain")
+        with col4:
+            custom_wind = st.number_input("Wind (m/s)", value=12.0, key="custom_wind")
+        if custom_name:
+            profiles_to_score[custom_name] = {"thresholds": {
+                "temp_min": custom_temp_min, "temp_max": custom_temp_max,
+                "rain": custom_rain, "wind": custom_wind
+            }}
+    
+    profile_scores = score_profiles(df_filtered, profiles_to_score)
+    st.dataframe(
+        profile_scores[['overall_risk', 'too_cold', 'too_hot', 'rainy', 'windy']]
+            .rename(columns={'overall_risk': 'Overall %', 'too_cold': 'Cold %', 'too_hot': 'Heat %',
+                             'rainy': 'Rain %', 'windy': 'Wind %'})
+            .round(1),
+        use_container_width=True
+    )
+    st.success(f"🏆 Best suited activity for this date: {profile_scores.index[0]} ({profile_scores['overall_risk'].iloc[0]:.1f}% risk)")
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+    
     # TREND ANALYSIS - Now this won't reset!
     st.markdown("---")
     st.markdown('<div class="mission-panel"><div class="panel-title">📈 CLIMATE TREND ANALYSIS</div>', unsafe_allow_html=True)
@@ -1459,11 +1067,15 @@ if st.session_state.analysis_complete:
     )
     
     if trend_variable in df_filtered.columns and df_filtered[trend_variable].notna().sum() > 10:
-        st.plotly_chart(create_weather_trend_analysis(df_filtered, trend_variable), use_container_width=True, key=f"trend_{trend_variable}")
+        trend_fig = figure_cache.get((analysis_fingerprint, trend_variable), create_weather_trend_analysis,
+                                     df_filtered, trend_variable)
+        st.plotly_chart(trend_fig, use_container_width=True, key=f"trend_{trend_variable}")
         
         # Calculate trend significance
         yearly_data = df_filtered.groupby('year')[trend_variable].mean().reset_index()
         if len(yearly_data) > 2:
+            # Imported here so scipy.stats (~0.5 s) loads with the first trend panel, not at startup
+            from scipy import stats as scipy_stats
             slope, intercept, r_value, p_value, std_err = scipy_stats.linregress(yearly_data['year'], yearly_data[trend_variable])
             
             if p_value < 0.05:
@@ -1485,7 +1097,8 @@ if st.session_state.analysis_complete:
         key="prob_selector"
     )
     
-    prob_fig = create_probability_curve(df_filtered, prob_variable, ACTIVITY_PROFILES[selected_activity]['thresholds'])
+    prob_fig = figure_cache.get((analysis_fingerprint, prob_variable, selected_activity), create_probability_curve,
+                                df_filtered, prob_variable, ACTIVITY_PROFILES[selected_activity]['thresholds'])
     if prob_fig:
         st.plotly_chart(prob_fig, use_container_width=True, key=f"prob_{prob_variable}")
         
@@ -1506,7 +1119,7 @@ if st.session_state.analysis_complete:
     st.markdown("---")
     st.markdown('<div class="mission-panel"><div class="panel-title">🌡 TEMPERATURE DISTRIBUTION</div>', unsafe_allow_html=True)
     
-    temp_fig = create_temperature_distribution(df_filtered)
+    temp_fig = figure_cache.get(analysis_fingerprint, create_temperature_distribution, df_filtered)
     if temp_fig:
         st.plotly_chart(temp_fig, use_container_width=True, key="temp_dist_main")
     
@@ -1533,11 +1146,12 @@ if st.session_state.analysis_complete:
     
     format_choice = st.radio(
         "Select Format:",
-        ["CSV", "JSON"],
+        list(EXPORT_FORMATS),
         horizontal=True
     )
     
-    col1, col2 = st.columns(2)
+    # Downloads are built only when clicked (deferred callables), not on every rerun
+    col1, col2, col3 = st.columns(3)
     
     with col1:
         summary = pd.DataFrame({
@@ -1548,37 +1162,38 @@ if st.session_state.analysis_complete:
             'High_C': [round(stats['typical_high'], 1)],
             'Low_C': [round(stats['typical_low'], 1)]
         })
+        summary_metadata = export_metadata(summary.columns, location_name, target_date, latitude, longitude, grid_cell)
         
-        if format_choice == "CSV":
-            download_data = prepare_data_with_metadata(summary, location_name, target_date)
-            file_extension = "csv"
-        else:
-            download_data = summary.to_json(orient="records")
-            file_extension = "json"
-            
         st.download_button(
             "📊 DOWNLOAD SUMMARY", 
-            download_data,
-            f"summary_{target_date.strftime('%Y%m%d')}.{file_extension}",
+            partial(export_file, summary, format_choice, summary_metadata),
+            export_file_name(f"summary_{target_date.strftime('%Y%m%d')}", format_choice),
+            mime=export_mime(format_choice),
             help="Download analysis summary",
             use_container_width=True
         )
     
     with col2:
-        if format_choice == "CSV":
-            full_data = prepare_data_with_metadata(df_filtered, location_name, target_date)
-            file_extension = "csv"
-        else:
-            full_data = df_filtered.to_json(orient="records")
-            file_extension = "json"
-            
+        full_metadata = export_metadata(df_filtered.columns, location_name, target_date, latitude, longitude, grid_cell)
+        
         st.download_button(
             "📁 DOWNLOAD FULL DATA",
-            full_data,
-            f"weather_data_{target_date.strftime('%Y%m%d')}.{file_extension}",
+            partial(export_file, df_filtered, format_choice, full_metadata),
+            export_file_name(f"weather_data_{target_date.strftime('%Y%m%d')}", format_choice),
+            mime=export_mime(format_choice),
             help="Download complete dataset",
             use_container_width=True
         )
+    
+    with col3:
+        st.download_button(
+            "🗄 DOWNLOAD CELL HISTORY",
+            partial(export_cell_history, get_history_store(), grid_cell, 15, format_choice, location_name, target_date),
+            export_file_name(f"history_{grid_cell[0]:.3f}_{grid_cell[1]:.3f}", format_choice),
+            mime=export_mime(format_choice),
+            help="Every stored day for this grid cell, not just the target date window",
+            use_container_width=True
+        )
     st.markdown("---")
     st.markdown('<div class="mission-panel"><div class="panel-title">🌅 SHARE ANALYSIS</div>', unsafe_allow_html=True)
     
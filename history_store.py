@@ -0,0 +1,137 @@
+"""Persistent SQLite store of raw daily NASA POWER records per grid cell"""
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+
+HISTORY_DB_PATH = os.environ.get(
+    "PARADE_GUARDS_HISTORY_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".power_cache", "history.sqlite3")
+)
+PROVISIONAL_DAYS = 30  # POWER can still revise the most recent days, everything older is final
+PROVISIONAL_REFRESH_HOURS = 12  # How long a provisional day is trusted before re-fetching
+
+def cell_key(lat, lon):
+    """Normalize coordinates into the key used for stored records
+
+    Callers pass grid cell centers (nasa_power.snap_to_grid), rounding only
+    guards against float noise.
+    """
+    return round(float(lat), 4), round(float(lon), 4)
+
+class HistoryStore:
+    """Daily POWER values keyed by (grid cell, parameter, date), kept across restarts
+
+    Past dates never expire. Only days inside the trailing PROVISIONAL_DAYS
+    window are re-fetched, once they are older than PROVISIONAL_REFRESH_HOURS,
+    so refreshing a cell only ever downloads the missing or provisional tail.
+    The fetch_log table records the last date and fetch time per cell.
+    """
+
+    def __init__(self, path=HISTORY_DB_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS daily (
+                    lat REAL NOT NULL,
+                    lon REAL NOT NULL,
+                    parameter TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    value REAL,
+                    fetched_at TEXT NOT NULL,
+                    PRIMARY KEY (lat, lon, parameter, date)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fetch_log (
+                    lat REAL NOT NULL,
+                    lon REAL NOT NULL,
+                    last_date TEXT NOT NULL,
+                    last_fetched_at TEXT NOT NULL,
+                    PRIMARY KEY (lat, lon)
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def save(self, lat, lon, parameters):
+        """Store a POWER parameter dict ({parameter: {YYYYMMDD: value}})"""
+        lat, lon = cell_key(lat, lon)
+        fetched_at = datetime.now().isoformat(timespec="seconds")
+        records = [
+            (lat, lon, parameter, date_str, value, fetched_at)
+            for parameter, values in parameters.items()
+            for date_str, value in values.items()
+        ]
+        if not records:
+            return
+        last_date = max(record[3] for record in records)
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO daily VALUES (?, ?, ?, ?, ?, ?)", records)
+            conn.execute(
+                "INSERT INTO fetch_log VALUES (?, ?, ?, ?) ON CONFLICT (lat, lon) DO UPDATE SET "
+                "last_date = max(last_date, excluded.last_date), last_fetched_at = excluded.last_fetched_at",
+                (lat, lon, last_date, fetched_at)
+            )
+
+    def fetch_log(self, lat, lon):
+        """(last stored date, last fetch time) for a cell, or None if it was never fetched
+
+        The fetch time doubles as a version: it changes whenever new data is
+        merged in, so in-memory caches keyed on it stay valid until then.
+        """
+        lat, lon = cell_key(lat, lon)
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT last_date, last_fetched_at FROM fetch_log WHERE lat = ? AND lon = ?", (lat, lon)
+            ).fetchone()
+
+    def load(self, lat, lon, start_date, end_date):
+        """Return stored values between two dates in the POWER parameter dict shape"""
+        lat, lon = cell_key(lat, lon)
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "SELECT parameter, date, value FROM daily "
+                "WHERE lat = ? AND lon = ? AND date BETWEEN ? AND ? ORDER BY date",
+                (lat, lon, start_date.strftime("%Y%m%d"), end_date.strftime("%Y%m%d"))
+            )
+            parameters = {}
+            for parameter, date_str, value in cursor:
+                parameters.setdefault(parameter, {})[date_str] = value
+        return parameters
+
+    def missing_ranges(self, lat, lon, start_date, end_date, now=None):
+        """Date ranges that must be fetched: never stored, or provisional and stale"""
+        lat, lon = cell_key(lat, lon)
+        now = now or datetime.now()
+        provisional_from = (now - timedelta(days=PROVISIONAL_DAYS)).strftime("%Y%m%d")
+        stale_before = (now - timedelta(hours=PROVISIONAL_REFRESH_HOURS)).isoformat(timespec="seconds")
+
+        # T2M is always requested, so its presence marks a day as stored
+        with closing(self._connect()) as conn:
+            fetched = dict(conn.execute(
+                "SELECT date, fetched_at FROM daily "
+                "WHERE lat = ? AND lon = ? AND parameter = 'T2M' AND date BETWEEN ? AND ?",
+                (lat, lon, start_date.strftime("%Y%m%d"), end_date.strftime("%Y%m%d"))
+            ))
+
+        ranges = []
+        range_start = None
+        day = start_date
+        while day <= end_date:
+            date_str = day.strftime("%Y%m%d")
+            fetched_at = fetched.get(date_str)
+            needed = fetched_at is None or (date_str >= provisional_from and fetched_at < stale_before)
+            if needed and range_start is None:
+                range_start = day
+            elif not needed and range_start is not None:
+                ranges.append((range_start, day - timedelta(days=1)))
+                range_start = None
+            day += timedelta(days=1)
+        if range_start is not None:
+            ranges.append((range_start, end_date))
+        return ranges
@@ -0,0 +1,79 @@
+"""Import-time report for the app's entry points, to keep cold starts fast
+
+Usage: python import_profile.py [charts final api_server ...] [--top 15] [--json import_profile.json]
+
+Each target module is imported in a fresh interpreter under
+`python -X importtime`. The report gives its total import time and the
+heaviest packages it pulled in. Packages the app cannot avoid (--baseline,
+streamlit/pandas/numpy/plotly by default) are imported first and left out of
+the numbers. Importing `final` runs the Streamlit script in bare mode, which
+is what a new session pays on its first run.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_TARGETS = ["final", "charts", "analysis", "share_image", "api_server", "batch_risk"]
+DEFAULT_BASELINE = ["streamlit", "pandas", "numpy", "plotly.graph_objects"]
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # Header row
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+def profile_module(module, baseline=DEFAULT_BASELINE):
+    """Import time of `module` on top of the baseline: total seconds and self seconds per top-level package"""
+    code = "\n".join([f"import {name}" for name in baseline] +
+                     ["import sys; sys.stderr.write('--- target ---\\n')", f"import {module}"])
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    stderr = result.stderr.split("--- target ---\n", 1)[-1]
+    rows = parse_importtime(stderr)
+
+    packages = {}
+    for name, self_us, _, _ in rows:
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us / 1e6
+    return {
+        'module': module,
+        'ok': result.returncode == 0,
+        'error': result.stderr.strip().splitlines()[-1] if result.returncode else None,
+        'total_s': sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1e6,
+        'modules_loaded': len(rows),
+        'packages': dict(sorted(packages.items(), key=lambda item: -item[1]))
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time per entry module and heaviest packages")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--baseline", nargs="*", default=DEFAULT_BASELINE,
+                        help="Modules imported first and excluded from the report")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest packages listed per target")
+    parser.add_argument("--json", default=None, help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report = [profile_module(target, args.baseline) for target in args.targets]
+    for entry in report:
+        status = "" if entry['ok'] else f"  (failed: {entry['error']})"
+        print(f"{entry['module']:<14} {entry['total_s'] * 1000:8.0f} ms  {entry['modules_loaded']:4d} modules{status}")
+        for package, seconds in list(entry['packages'].items())[:args.top]:
+            print(f"    {package:<28} {seconds * 1000:8.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'baseline': args.baseline, 'python': sys.version.split()[0], 'targets': report}, f, indent=2)
+        print(f"Report written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+"""NASA POWER daily point API fetch layer (no Streamlit dependency)"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from comfort_metrics import add_comfort_metrics
+from power_client import get_power_client
+
+# Overridable so load tests and benchmarks can point at power_stub.py instead
+POWER_API_URL = os.environ.get("PARADE_GUARDS_POWER_URL", "https://power.larc.nasa.gov/api/temporal/daily/point")
+POWER_PARAMETERS = "T2M,T2M_MAX,T2M_MIN,PRECTOTCORR,WS2M,RH2M,CLOUD_AMT,QV2M,PS"
+MAX_CONCURRENT_REQUESTS = 4  # Max in-flight requests per analysis, keeps us polite to the API
+MAX_CONCURRENT_LOCATIONS = 3  # Locations fetched side by side when comparing
+WINDOW_DAYS = 5  # Days either side of the target date
+RANGE_CHUNK_YEARS = 20  # Years covered by a single request in "range" mode
+GRID_LAT_STEP = 0.5  # POWER meteorology (MERRA-2) grid spacing in degrees
+GRID_LON_STEP = 0.625
+
+# "per_year": one small request per year window
+# "range": one contiguous request per RANGE_CHUNK_YEARS, windows sliced client-side
+FETCH_MODES = ("per_year", "range")
+
+# Same logger as fetch_report, so failures show up even when no FetchReport is passed
+logger = logging.getLogger("parade_guards.fetch")
+
+def snap_to_grid(lat, lon):
+    """Center of the POWER grid cell containing a point
+
+    Every point inside a cell gets identical data back, so fetching and caching
+    by cell center lets nearby coordinates share results.
+    """
+    lat = min(90.0, max(-90.0, round(float(lat) / GRID_LAT_STEP) * GRID_LAT_STEP))
+    lon = round(float(lon) / GRID_LON_STEP) * GRID_LON_STEP
+    if lon >= 180.0:
+        lon -= 360.0
+    return round(lat, 4), round(lon, 4)
+
+def window_center(year, target_month, target_day):
+    """Target date in a given year, Feb 29 falls back to Feb 28 in non-leap years"""
+    try:
+        return datetime(year, target_month, target_day)
+    except ValueError:
+        if target_month == 2 and target_day == 29:
+            return datetime(year, 2, 28)
+        return None
+
+def year_centers(years, target_month, target_day):
+    """Map each year to its window center, skipping years where the date does not exist"""
+    centers = {year: window_center(year, target_month, target_day) for year in years}
+    return {year: center for year, center in centers.items() if center is not None}
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one, sharing its result or exception
+
+    The first caller for a key runs the call; callers arriving while it is in
+    flight wait for it instead of starting their own. Once it finishes the key
+    is forgotten, so later callers start a fresh call.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def call(self, key, func, *args):
+        """(finished Future, shared): shared is True when another caller's call supplied the outcome"""
+        with self._lock:
+            call = self._calls.get(key)
+            shared = call is not None
+            if not shared:
+                call = self._calls[key] = Future()
+        if shared:
+            call.exception()  # Wait for the leader
+            return call, True
+
+        try:
+            call.set_result(func(*args))
+        except BaseException as exc:
+            call.set_exception(exc)  # Waiting callers must be released even on KeyboardInterrupt
+            if not isinstance(exc, Exception):
+                raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return call, False
+
+# One in-flight upstream request per (grid cell, date range), shared by every session and thread
+_power_requests = SingleFlight()
+
+def _get_power_json(url):
+    response = get_power_client().get(url)
+    return response, response.json()
+
+def request_power_data(lat, lon, start_date, end_date, report=None):
+    """Request daily POWER parameters for a date range, returns the parameter dict or None
+
+    Concurrent calls for the same cell and range share one upstream request,
+    so treat the returned dict as read-only.
+
+    With a `report` (fetch_report.FetchReport) the request's latency, size,
+    retries and any failure reason are recorded.
+    """
+    # Enhanced parameters including humidity, cloud cover, and more
+    url = (f"{POWER_API_URL}?"
+           f"parameters={POWER_PARAMETERS}&"
+           f"community=RE&longitude={lon}&latitude={lat}&"
+           f"start={start_date.strftime('%Y%m%d')}&end={end_date.strftime('%Y%m%d')}&format=JSON")
+
+    started = time.perf_counter()
+    call, shared = _power_requests.call(url, _get_power_json, url)
+    try:
+        response, data = call.result()
+    except Exception as exc:
+        if report is not None:
+            report.record_failure(lat, lon, start_date, end_date, time.perf_counter() - started, exc, shared)
+        raise
+
+    parameters = data.get('properties', {}).get('parameter')
+    if report is not None:
+        report.record_response(lat, lon, start_date, end_date, time.perf_counter() - started, response, parameters,
+                               shared)
+    return parameters
+
+# POWER parameter -> DataFrame column, in output column order
+POWER_COLUMNS = {
+    'T2M': 'temperature', 'T2M_MAX': 'temp_max', 'T2M_MIN': 'temp_min',
+    'PRECTOTCORR': 'precipitation', 'WS2M': 'wind_speed', 'RH2M': 'humidity',
+    'CLOUD_AMT': 'cloud_cover', 'PS': 'pressure',
+}
+REQUIRED_COLUMNS = ['temperature', 'temp_max', 'temp_min', 'precipitation', 'wind_speed']
+POWER_FILL_VALUE = -999.0
+
+def parse_power_parameters(parameters):
+    """Build a daily DataFrame straight from a POWER parameter dict
+
+    Dates are parsed in one vectorized call, -999 fill values become NaN,
+    days missing any core value are dropped and comfort metrics are added.
+    """
+    columns = ['date', 'month', 'day', 'temperature', 'temp_max', 'temp_min', 'precipitation',
+               'wind_speed', 'humidity', 'cloud_cover', 'pressure']
+    if not parameters or not parameters.get('T2M'):
+        return pd.DataFrame(columns=columns + ['heat_index', 'wind_chill', 'dew_point', 'humidex'])
+
+    raw = pd.DataFrame({column: pd.Series(parameters.get(parameter, {}), dtype='float64')
+                        for parameter, column in POWER_COLUMNS.items()})
+    raw = raw.reindex(list(parameters['T2M'].keys()))
+    raw = raw.mask(raw == POWER_FILL_VALUE).dropna(subset=REQUIRED_COLUMNS)
+
+    df = raw.reset_index(drop=True)
+    dates = pd.to_datetime(pd.Index(raw.index), format="%Y%m%d")
+    df.insert(0, 'date', dates)
+    df.insert(1, 'month', dates.month)
+    df.insert(2, 'day', dates.day)
+
+    return add_comfort_metrics(df[columns].copy())
+
+def fetch_year_window(lat, lon, year, target_month, target_day, window_days=WINDOW_DAYS, report=None):
+    """Fetch the ±window_days window around the target date for a single year"""
+    center_date = window_center(year, target_month, target_day)
+    if center_date is None:
+        return pd.DataFrame()
+
+    parameters = request_power_data(lat, lon,
+                                    center_date - timedelta(days=window_days),
+                                    center_date + timedelta(days=window_days), report)
+    if parameters is None:
+        return pd.DataFrame()
+
+    df = parse_power_parameters(parameters)
+    df.insert(0, 'year', year)
+    return df
+
+def fetch_range_windows(lat, lon, years, target_month, target_day, window_days=WINDOW_DAYS, report=None):
+    """Fetch one contiguous range spanning every year's window and slice the windows out locally"""
+    centers = year_centers(years, target_month, target_day)
+    if not centers:
+        return pd.DataFrame()
+
+    parameters = request_power_data(lat, lon,
+                                    min(centers.values()) - timedelta(days=window_days),
+                                    max(centers.values()) + timedelta(days=window_days), report)
+    if parameters is None:
+        return pd.DataFrame()
+
+    return slice_windows(parse_power_parameters(parameters), centers, window_days)
+
+def slice_windows(history, centers, window_days=WINDOW_DAYS):
+    """Pick each year's ±window_days rows out of a contiguous daily history
+
+    Windows near Jan 1 / Dec 31 cross calendar years, so each window date is
+    labelled with the year of its center rather than its calendar year.
+    """
+    window_dates = pd.DataFrame(
+        [(year, center + timedelta(days=offset))
+         for year, center in centers.items()
+         for offset in range(-window_days, window_days + 1)],
+        columns=['year', 'date']
+    )
+    window_dates['date'] = pd.to_datetime(window_dates['date'])
+    return window_dates.merge(history, on='date', how='inner')
+
+def split_range(start_date, end_date, max_days=RANGE_CHUNK_YEARS * 366):
+    """Split a date range into consecutive pieces of at most max_days"""
+    pieces = []
+    while start_date <= end_date:
+        piece_end = min(end_date, start_date + timedelta(days=max_days - 1))
+        pieces.append((start_date, piece_end))
+        start_date = piece_end + timedelta(days=1)
+    return pieces
+
+def _request_ranges(lat, lon, ranges, max_workers=MAX_CONCURRENT_REQUESTS, progress_callback=None, report=None):
+    """Request date ranges in parallel, yielding parameter dicts on the calling thread as they arrive"""
+    tasks = [piece for date_range in ranges for piece in split_range(*date_range)]
+    if not tasks:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(request_power_data, lat, lon, piece_start, piece_end, report):
+                   f"{piece_start:%Y-%m-%d} to {piece_end:%Y-%m-%d}"
+                   for piece_start, piece_end in tasks}
+        for idx, future in enumerate(as_completed(futures)):
+            try:
+                parameters = future.result()
+            except Exception as exc:
+                logger.warning("fetch %.4f,%.4f %s failed: %s", lat, lon, futures[future], exc)
+                parameters = None
+            if parameters:
+                yield parameters
+            if progress_callback is not None:
+                progress_callback(idx + 1, len(futures), futures[future])
+
+def update_point_history(lat, lon, start_date, end_date, store, max_workers=MAX_CONCURRENT_REQUESTS,
+                         progress_callback=None, report=None):
+    """Download only the days `store` is missing or holds as stale provisional values"""
+    ranges = store.missing_ranges(lat, lon, start_date, end_date)
+    if report is not None:
+        report.record_store_lookup(lat, lon, start_date, end_date, ranges)
+    # Saving happens on the calling thread so each fetch has one SQLite writer
+    for parameters in _request_ranges(lat, lon, ranges, max_workers, progress_callback, report):
+        store.save(lat, lon, parameters)
+
+def fetch_point_history(lat, lon, start_date, end_date, store=None, max_workers=MAX_CONCURRENT_REQUESTS,
+                        progress_callback=None, report=None):
+    """Daily POWER parameters for a date range
+
+    With a `store` only the ranges it is missing are requested and the result
+    is read back from disk; without one the whole range is requested.
+    """
+    if store is not None:
+        update_point_history(lat, lon, start_date, end_date, store, max_workers, progress_callback, report)
+        return store.load(lat, lon, start_date, end_date)
+
+    merged = {}
+    for parameters in _request_ranges(lat, lon, [(start_date, end_date)], max_workers, progress_callback, report):
+        for parameter, values in parameters.items():
+            merged.setdefault(parameter, {}).update(values)
+    return merged
+
+def analysis_years(years_back=15):
+    """Past calendar years covered by an analysis"""
+    current_year = datetime.now().year
+    return list(range(max(1981, current_year - years_back), current_year))
+
+def history_span(years_back=15, window_days=WINDOW_DAYS):
+    """First and last day any year's ±window_days window could touch, None if no years"""
+    years = analysis_years(years_back)
+    if not years:
+        return None
+    yesterday = datetime.combine(datetime.now().date(), datetime.min.time()) - timedelta(days=1)
+    span_start = datetime(years[0], 1, 1) - timedelta(days=window_days)
+    span_end = min(datetime(years[-1], 12, 31) + timedelta(days=window_days), yesterday)
+    return span_start, span_end
+
+def _daily_frame(parameters):
+    if not parameters:
+        return pd.DataFrame()
+    df = parse_power_parameters(parameters)
+    if not df.empty:
+        df = df.sort_values('date').reset_index(drop=True)
+    return df
+
+def sync_location_history(lat, lon, store, years_back=15, max_workers=MAX_CONCURRENT_REQUESTS,
+                          window_days=WINDOW_DAYS, progress_callback=None, report=None):
+    """Bring a cell's stored history up to date, downloading only the missing or provisional tail
+
+    Returns the cell's store version (last fetch time), which only changes
+    when new data was merged in.
+    """
+    lat, lon = snap_to_grid(lat, lon)
+    span = history_span(years_back, window_days)
+    if span is not None:
+        update_point_history(lat, lon, *span, store, max_workers=max_workers, progress_callback=progress_callback,
+                             report=report)
+    log = store.fetch_log(lat, lon)
+    return log[1] if log else None
+
+def load_location_history(lat, lon, store, years_back=15, window_days=WINDOW_DAYS):
+    """A cell's history read from the store alone, never touching the network"""
+    lat, lon = snap_to_grid(lat, lon)
+    span = history_span(years_back, window_days)
+    if span is None:
+        return pd.DataFrame()
+    return _daily_frame(store.load(lat, lon, *span))
+
+def iter_location_history(lat, lon, store, years_back=15, window_days=WINDOW_DAYS, chunk_years=5):
+    """A cell's stored history as daily frames of chunk_years years each, oldest first
+
+    Only one chunk is in memory at a time, for exports spanning decades.
+    Disk only, like load_location_history.
+    """
+    lat, lon = snap_to_grid(lat, lon)
+    span = history_span(years_back, window_days)
+    if span is None:
+        return
+    span_start, span_end = span
+    while span_start <= span_end:
+        chunk_end = min(span_end, datetime(span_start.year + chunk_years, 1, 1) - timedelta(days=1))
+        df = _daily_frame(store.load(lat, lon, span_start, chunk_end))
+        if not df.empty:
+            yield df
+        span_start = chunk_end + timedelta(days=1)
+
+def fetch_location_history(lat, lon, years_back=15, store=None, max_workers=MAX_CONCURRENT_REQUESTS,
+                           window_days=WINDOW_DAYS, progress_callback=None, report=None):
+    """Full daily history for a grid cell, independent of any target date
+
+    Covers every day that any year's ±window_days window could touch, so
+    extract_date_windows can answer every target date from the same frame.
+    With a `store` only the missing or provisional tail is downloaded.
+    """
+    if store is not None:
+        sync_location_history(lat, lon, store, years_back=years_back, max_workers=max_workers,
+                              window_days=window_days, progress_callback=progress_callback, report=report)
+        return load_location_history(lat, lon, store, years_back=years_back, window_days=window_days)
+
+    lat, lon = snap_to_grid(lat, lon)
+    span = history_span(years_back, window_days)
+    if span is None:
+        return pd.DataFrame()
+    return _daily_frame(fetch_point_history(lat, lon, *span, max_workers=max_workers,
+                                            progress_callback=progress_callback, report=report))
+
+def sync_location_histories(cells, store, years_back=15, max_workers=MAX_CONCURRENT_LOCATIONS,
+                            progress_callback=None, report=None):
+    """Sync several grid cells side by side, returns {cell: store version}"""
+    versions = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(sync_location_history, lat, lon, store, years_back=years_back,
+                                   report=report): (lat, lon)
+                   for lat, lon in set(cells)}
+        for idx, future in enumerate(as_completed(futures)):
+            cell = futures[future]
+            try:
+                versions[cell] = future.result()
+            except Exception as exc:
+                logger.warning("sync %.4f,%.4f failed: %s", cell[0], cell[1], exc)
+                versions[cell] = None
+            if progress_callback is not None:
+                progress_callback(idx + 1, len(futures), f"{cell[0]:.2f}°, {cell[1]:.2f}°")
+    return versions
+
+def extract_date_windows(history, target_month, target_day, years_back=15, window_days=WINDOW_DAYS):
+    """Slice each year's ±window_days window around a target date out of a location history"""
+    centers = year_centers(analysis_years(years_back), target_month, target_day)
+    if history.empty or not centers:
+        return pd.DataFrame()
+
+    return _history_frame(slice_windows(history, centers, window_days))
+
+def fetch_weather_history(lat, lon, target_month, target_day, years_back=15, mode="per_year",
+                          max_workers=MAX_CONCURRENT_REQUESTS, window_days=WINDOW_DAYS,
+                          progress_callback=None, store=None, report=None):
+    """Fetch the ±window_days history around a target date for every past year
+
+    Coordinates are snapped to their POWER grid cell before any request or
+    store lookup.
+
+    Requests run in parallel with at most `max_workers` in flight. `mode` picks
+    one request per year ("per_year") or one request per RANGE_CHUNK_YEARS
+    block ("range"). `progress_callback(done, total, label)` is called from the
+    calling thread as each request completes.
+
+    With a `store` (history_store.HistoryStore) the full location history is
+    kept on disk, so any later target date at the same point is answered
+    without network calls; `mode` is ignored.
+
+    With a `report` (fetch_report.FetchReport) every request and store hit is
+    recorded, see FetchReport.year_status for per-year coverage.
+    """
+    if mode not in FETCH_MODES:
+        raise ValueError(f"Unknown fetch mode: {mode}")
+
+    if store is not None:
+        history = fetch_location_history(lat, lon, years_back=years_back, store=store, max_workers=max_workers,
+                                         window_days=window_days, progress_callback=progress_callback,
+                                         report=report)
+        return extract_date_windows(history, target_month, target_day, years_back, window_days)
+
+    lat, lon = snap_to_grid(lat, lon)
+    years = analysis_years(years_back)
+
+    if mode == "range":
+        chunks = [years[i:i + RANGE_CHUNK_YEARS] for i in range(0, len(years), RANGE_CHUNK_YEARS)]
+        tasks = [(f"{chunk[0]}-{chunk[-1]}", fetch_range_windows, chunk) for chunk in chunks]
+    else:
+        tasks = [(str(year), fetch_year_window, year) for year in years]
+
+    frames = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(func, lat, lon, arg, target_month, target_day, window_days, report): label
+            for label, func, arg in tasks
+        }
+        for idx, future in enumerate(as_completed(futures)):
+            try:
+                frames.append(future.result())
+            except Exception as exc:
+                logger.warning("fetch %.4f,%.4f %s failed: %s", lat, lon, futures[future], exc)
+            if progress_callback is not None:
+                progress_callback(idx + 1, len(futures), futures[future])
+
+    frames = [frame for frame in frames if not frame.empty]
+    return _history_frame(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame())
+
+def _history_frame(df):
+    if not df.empty:
+        df = df.sort_values(['year', 'date']).reset_index(drop=True)
+    return df
+
+def fetch_additional_data(lat, lon, start_date, end_date):
+    """Fetch additional data from GES DISC OPeNDAP"""
+    try:
+        # GES DISC API endpoint
+        ges_disc_url = f"https://disc.gsfc.nasa.gov/api/search?lat={lat}&lon={lon}&startTime={start_date}&endTime={end_date}"
+        return get_power_client().get_json(ges_disc_url)
+    except Exception:
+        return None
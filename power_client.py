@@ -0,0 +1,102 @@
+"""Shared HTTP client for the NASA APIs: pooled keep-alive session, retries and per-host limits"""
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MAX_REQUESTS_PER_HOST = 6  # In flight across every analysis and session, whatever the thread pools ask for
+MAX_RETRIES = 4  # Retries after the first attempt on throttling, server errors and dropped connections
+BACKOFF_BASE = 0.5  # Seconds, doubled on every retry
+BACKOFF_CAP = 20  # Seconds, longest single wait (also caps a server's Retry-After)
+REQUEST_TIMEOUT = 30  # Seconds
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class PowerClient:
+    """Thread-safe GET client shared by every fetch
+
+    One requests.Session keeps TCP/TLS connections alive between calls.
+    Throttling (429), 5xx responses, timeouts and dropped connections are
+    retried with exponential backoff and full jitter, honouring Retry-After.
+    A semaphore per host caps concurrent requests, and it is released while
+    backing off so a throttled request does not hold a slot.
+    """
+
+    def __init__(self, max_per_host=MAX_REQUESTS_PER_HOST, max_retries=MAX_RETRIES,
+                 backoff_base=BACKOFF_BASE, backoff_cap=BACKOFF_CAP, timeout=REQUEST_TIMEOUT):
+        self.max_per_host = max_per_host
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_per_host)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_limits[host]
+
+    def _backoff(self, attempt, retry_after=None):
+        """Seconds to wait before retry number `attempt` (0-based)"""
+        if retry_after is not None:
+            try:
+                return min(self.backoff_cap, max(0.0, float(retry_after)))
+            except ValueError:
+                pass  # HTTP-date form, fall back to our own schedule
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def get(self, url, **kwargs):
+        """GET with retries, returns the successful response or raises the last error
+
+        Both carry a `retries` attribute with the number of retries made.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        limit = self._host_limit(url)
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                with limit:
+                    response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt == self.max_retries:
+                    exc.retries = attempt
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    # Retries made are attached for diagnostics (fetch_report)
+                    response.retries = attempt
+                    try:
+                        response.raise_for_status()
+                    except requests.HTTPError as exc:
+                        exc.retries = attempt
+                        raise
+                    return response
+                retry_after = response.headers.get("Retry-After")
+                response.close()
+            time.sleep(self._backoff(attempt, retry_after))
+
+    def get_json(self, url, **kwargs):
+        return self.get(url, **kwargs).json()
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def get_power_client():
+    """Process-wide client, so every caller shares one connection pool and host limit"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = PowerClient()
+        return _default_client
@@ -0,0 +1,238 @@
+"""Local stand-in for the NASA POWER daily point API, for offline load tests and benchmarks
+
+Serves the same JSON shape as POWER: synthetic but deterministic values, or
+values replayed from saved POWER responses. Latency, random 5xx errors and
+429 throttling can all be configured. Point the app at it with:
+
+    python power_stub.py --port 8765 --latency 0.05 --error-rate 0.02 --rate-limit 20
+    PARADE_GUARDS_POWER_URL=http://127.0.0.1:8765/api/temporal/daily/point streamlit run final.py
+
+Failures are drawn per (URL, attempt number), so the same run sees the same
+errors whatever order its threads hit the server in.
+"""
+import argparse
+import glob
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+STUB_PATH = "/api/temporal/daily/point"
+FILL_VALUE = -999.0
+
+def _noise(lat, lon, ordinals, salt):
+    """Deterministic uniform [0, 1) values per (cell, day, parameter)"""
+    x = ordinals * 12.9898 + lat * 78.233 + lon * 37.719 + salt * 4.581
+    return np.modf(np.abs(np.sin(x) * 43758.5453))[0]
+
+def synthetic_parameters(lat, lon, dates, parameters):
+    """Plausible daily POWER values for a point: a seasonal cycle with day to day noise"""
+    ordinals = np.array([d.toordinal() for d in dates], dtype=float)
+    day_of_year = np.array([d.timetuple().tm_yday for d in dates], dtype=float)
+    season = np.cos((day_of_year - 200) / 365.25 * 2 * np.pi) * (1 if lat >= 0 else -1)
+
+    mean_temp = 27 - 0.45 * abs(lat) + (0.25 * abs(lat)) * season + (_noise(lat, lon, ordinals, 1) - 0.5) * 8
+    spread = 4 + 4 * _noise(lat, lon, ordinals, 2)
+    wet = _noise(lat, lon, ordinals, 3) < 0.35
+    values = {
+        'T2M': mean_temp,
+        'T2M_MAX': mean_temp + spread,
+        'T2M_MIN': mean_temp - spread,
+        'PRECTOTCORR': np.where(wet, -np.log(1 - _noise(lat, lon, ordinals, 4)) * 6, 0.0),
+        'WS2M': 0.5 + 8 * _noise(lat, lon, ordinals, 5) ** 2,
+        'RH2M': 40 + 55 * _noise(lat, lon, ordinals, 6),
+        'CLOUD_AMT': 100 * _noise(lat, lon, ordinals, 7),
+        'QV2M': 2 + 14 * _noise(lat, lon, ordinals, 8),
+        'PS': 100 + 2 * (_noise(lat, lon, ordinals, 9) - 0.5),
+    }
+    keys = [d.strftime("%Y%m%d") for d in dates]
+    return {
+        parameter: dict(zip(keys, np.round(values.get(parameter, np.zeros(len(dates))), 2).tolist()))
+        for parameter in parameters
+    }
+
+def load_recordings(pattern):
+    """Saved POWER responses merged per cell: {(lat, lon): {parameter: {YYYYMMDD: value}}}"""
+    cells = {}
+    for path in glob.glob(pattern):
+        with open(path) as f:
+            data = json.load(f)
+        lon, lat = data['geometry']['coordinates'][:2]
+        cell = cells.setdefault((round(lat, 4), round(lon, 4)), {})
+        for parameter, values in data['properties']['parameter'].items():
+            cell.setdefault(parameter, {}).update(values)
+    return cells
+
+class PowerStub:
+    """Threaded stub server, usable as a context manager that yields its base URL
+
+    `latency` seconds (plus up to `jitter` more) are added to every response.
+    `error_rate` is the chance of a 503. `rate_limit` caps requests per second
+    with a token bucket of `burst`, answering 429 with Retry-After above it.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit=None,
+                 burst=None, recordings=None, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst or (rate_limit or 1)
+        self.recordings = load_recordings(recordings) if recordings else {}
+        self.seed = seed
+        self.stats = {'requests': 0, 'ok': 0, 'errors': 0, 'throttled': 0, 'bad_requests': 0}
+
+        self._attempts = {}
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{STUB_PATH}"
+
+    def _throttle(self):
+        """Seconds until a token is free, or None if this request may proceed"""
+        if not self.rate_limit:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_limit)
+            self._refilled_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            return (1 - self._tokens) / self.rate_limit
+
+    def _draw(self, path):
+        """Per (URL, attempt) random generator, independent of thread scheduling"""
+        with self._lock:
+            attempt = self._attempts.get(path, 0)
+            self._attempts[path] = attempt + 1
+        return random.Random(zlib.crc32(f"{self.seed}|{path}|{attempt}".encode()))
+
+    def _count(self, key):
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats[key] += 1
+
+    def respond(self, path):
+        """(status, headers, body) for one request path"""
+        split = urlsplit(path)
+        if split.path.rstrip("/") != STUB_PATH:
+            self._count('bad_requests')
+            return 404, {}, b'{"message": "not found"}'
+
+        wait = self._throttle()
+        if wait is not None:
+            self._count('throttled')
+            return 429, {"Retry-After": str(math.ceil(wait))}, b'{"message": "too many requests"}'
+
+        rng = self._draw(path)
+        time.sleep(self.latency + rng.uniform(0, self.jitter))
+        if rng.random() < self.error_rate:
+            self._count('errors')
+            return 503, {}, b'{"message": "service unavailable"}'
+
+        try:
+            query = {key: values[0] for key, values in parse_qs(split.query).items()}
+            lat, lon = float(query['latitude']), float(query['longitude'])
+            start, end = (datetime.strptime(query[key], "%Y%m%d") for key in ('start', 'end'))
+            parameters = query['parameters'].split(",")
+        except (KeyError, ValueError):
+            self._count('bad_requests')
+            return 422, {}, b'{"message": "invalid request"}'
+
+        dates = pd.date_range(start, end, freq="D").to_pydatetime().tolist()
+        recorded = self.recordings.get((round(lat, 4), round(lon, 4)))
+        if recorded is not None:
+            keys = [d.strftime("%Y%m%d") for d in dates]
+            values = {p: {k: recorded.get(p, {}).get(k, FILL_VALUE) for k in keys} for p in parameters}
+        else:
+            values = synthetic_parameters(lat, lon, dates, parameters)
+
+        body = json.dumps({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [lon, lat, 0.0]},
+            "properties": {"parameter": values},
+            "header": {"title": "NASA/POWER stub", "fill_value": FILL_VALUE,
+                       "start": query['start'], "end": query['end']},
+            "messages": []
+        }).encode()
+        self._count('ok')
+        return 200, {"Content-Type": "application/json"}, body
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+            def do_GET(self):
+                status, headers, body = stub.respond(self.path)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start().url
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local NASA POWER daily point API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra seconds, at random")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests per second before 429s")
+    parser.add_argument("--burst", type=int, default=None, help="Token bucket size for --rate-limit")
+    parser.add_argument("--replay", default=None, help="Glob of saved POWER JSON responses to serve")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stub = PowerStub(args.host, args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                     rate_limit=args.rate_limit, burst=args.burst, recordings=args.replay, seed=args.seed)
+    print(f"Serving NASA POWER stub at {stub.url}")
+    print(f"Use it with PARADE_GUARDS_POWER_URL={stub.url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+        print(json.dumps(stub.stats))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Preset cities and activity profiles shared by the app and offline tools"""
+
+# -----------------------------
+# Global Cities Database
+# -----------------------------
+LOCATIONS = {
+    "🇨🇦 Canada": {
+        "Ontario": {
+            "Toronto": (43.6532, -79.3832),
+            "Ottawa": (45.4215, -75.6972),
+            "Mississauga": (43.5890, -79.6441),
+            "Brampton": (43.7315, -79.7624),
+            "Hamilton": (43.2557, -79.8711),
+            "London": (42.9849, -81.2453),
+            "Windsor": (42.3149, -83.0364),
+            "Vaughan": (43.8563, -79.5085),
+            "Kitchener": (43.4516, -80.4925),
+            "Markham": (43.8561, -79.3370)
+        },
+        "Quebec": {
+            "Montreal": (45.5017, -73.5673),
+            "Quebec City": (46.8139, -71.2080),
+            "Laval": (45.6066, -73.7124),
+            "Gatineau": (45.4765, -75.7013),
+            "Longueuil": (45.5308, -73.5177),
+            "Sherbrooke": (45.4040, -71.8929),
+            "Saguenay": (48.4279, -71.0485),
+            "Levis": (46.7382, -71.2465),
+            "Trois-Rivieres": (46.3432, -72.5429),
+            "Terrebonne": (45.6929, -73.6331)
+        },
+        "British Columbia": {
+            "Vancouver": (49.2827, -123.1207),
+            "Victoria": (48.4284, -123.3656),
+            "Surrey": (49.1913, -122.8490),
+            "Burnaby": (49.2488, -122.9805),
+            "Richmond": (49.1666, -123.1336),
+            "Abbotsford": (49.0504, -122.3045),
+            "Coquitlam": (49.2838, -122.7932),
+            "Kelowna": (49.8880, -119.4960),
+            "Delta": (49.0847, -123.0587),
+            "Nanaimo": (49.1659, -123.9401)
+        }
+    },
+    "🇺🇸 United States": {
+        "California": {
+            "Los Angeles": (34.0522, -118.2437),
+            "San Francisco": (37.7749, -122.4194),
+            "San Diego": (32.7157, -117.1611),
+            "San Jose": (37.3382, -121.8863),
+            "Sacramento": (38.5816, -121.4944),
+            "Oakland": (37.8044, -122.2712),
+            "Long Beach": (33.7701, -118.1937),
+            "Anaheim": (33.8366, -117.9143),
+            "Santa Ana": (33.7455, -117.8677),
+            "Riverside": (33.9534, -117.3962)
+        },
+        "New York": {
+            "New York City": (40.7128, -74.0060),
+            "Buffalo": (42.8864, -78.8784),
+            "Rochester": (43.1566, -77.6088),
+            "Syracuse": (43.0481, -76.1474),
+            "Albany": (42.6526, -73.7562),
+            "Yonkers": (40.9312, -73.8987),
+            "Utica": (43.1009, -75.2327),
+            "White Plains": (41.0340, -73.7629),
+            "Binghamton": (42.0987, -75.9180),
+            "Poughkeepsie": (41.7004, -73.9210)
+        }
+    },
+    "🇬🇧 United Kingdom": {
+        "England": {
+            "London": (51.5074, -0.1278),
+            "Manchester": (53.4808, -2.2426),
+            "Birmingham": (52.4862, -1.8904),
+            "Liverpool": (53.4084, -2.9916),
+            "Leeds": (53.8008, -1.5491),
+            "Sheffield": (53.3811, -1.4701),
+            "Newcastle": (54.9783, -1.6178),
+            "Nottingham": (52.9548, -1.1581),
+            "Bristol": (51.4545, -2.5879),
+            "Leicester": (52.6369, -1.1398)
+        },
+        "Scotland": {
+            "Edinburgh": (55.9533, -3.1883),
+            "Glasgow": (55.8642, -4.2518),
+            "Aberdeen": (57.1497, -2.0943),
+            "Dundee": (56.4620, -2.9707),
+            "Inverness": (57.4778, -4.2247),
+            "Perth": (56.3950, -3.4308),
+            "Stirling": (56.1165, -3.9369),
+            "St Andrews": (56.3398, -2.7967),
+            "Falkirk": (56.0019, -3.7839),
+            "Ayr": (55.4589, -4.6292)
+        }
+    },
+    "🇮🇳 India": {
+        "Maharashtra": {
+            "Mumbai": (19.0760, 72.8777),
+            "Pune": (18.5204, 73.8567),
+            "Nagpur": (21.1458, 79.0882),
+            "Nashik": (19.9975, 73.7898),
+            "Aurangabad": (19.8762, 75.3433)
+        },
+        "Delhi": {
+            "New Delhi": (28.6139, 77.2090),
+            "North Delhi": (28.7041, 77.1025),
+            "South Delhi": (28.5244, 77.1855),
+            "East Delhi": (28.6280, 77.2789),
+            "West Delhi": (28.6663, 77.0665)
+        },
+        "Tamil Nadu": {
+            "Chennai": (13.0827, 80.2707),
+            "Coimbatore": (11.0168, 76.9558),
+            "Madurai": (9.9252, 78.1198),
+            "Salem": (11.6643, 78.1460),
+            "Tiruchirappalli": (10.7905, 78.7047)
+        }
+    },
+    "🇯🇵 Japan": {
+        "Kanto": {
+            "Tokyo": (35.6762, 139.6503),
+            "Yokohama": (35.4437, 139.6380),
+            "Saitama": (35.8616, 139.6455),
+            "Chiba": (35.6074, 140.1065),
+            "Kawasaki": (35.5308, 139.7029)
+        },
+        "Kansai": {
+            "Osaka": (34.6937, 135.5023),
+            "Kyoto": (35.0116, 135.7681),
+            "Kobe": (34.6901, 135.1955),
+            "Nara": (34.6851, 135.8048),
+            "Wakayama": (34.2305, 135.1708)
+        }
+    }
+}
+# You can continue adding more countries following the same pattern:
+# "🇦🇺 Australia", "🇩🇪 Germany", "🇫🇷 France", "🇮🇹 Italy", etc.
+
+# -----------------------------
+# Activity Profiles
+# -----------------------------
+ACTIVITY_PROFILES = {
+    "Beach Day 🏖": {
+        "icon": "🏖",
+        "thresholds": {"temp_min": 22, "temp_max": 38, "rain": 2, "wind": 10},
+        "description": "Sunshine, warm temps, light winds"
+    },
+    "Hiking/Trail 🥾": {
+        "icon": "🥾",
+        "thresholds": {"temp_min": 5, "temp_max": 32, "rain": 5, "wind": 15},
+        "description": "Moderate temps, dry conditions"
+    },
+    "Picnic/BBQ 🧺": {
+        "icon": "🧺",
+        "thresholds": {"temp_min": 15, "temp_max": 35, "rain": 1, "wind": 12},
+        "description": "Pleasant weather, no rain"
+    },
+    "Parade/Festival 🎉": {
+        "icon": "🎉",
+        "thresholds": {"temp_min": 0, "temp_max": 35, "rain": 3, "wind": 15},
+        "description": "Comfortable for crowds"
+    },
+    "General Outdoor 🌳": {
+        "icon": "🌳",
+        "thresholds": {"temp_min": 10, "temp_max": 32, "rain": 3, "wind": 12},
+        "description": "Comfortable conditions"
+    }
+}
+
+def _normalize(name):
+    return " ".join(name.lower().split())
+
+def find_location(name):
+    """(lat, lon) for "City", "City, Region" or literal "lat, lon" text
+
+    Raises ValueError for unknown names and for city names that exist in
+    more than one region.
+    """
+    parts = [part.strip() for part in name.split(",")]
+    if len(parts) == 2:
+        try:
+            return float(parts[0]), float(parts[1])
+        except ValueError:
+            pass
+
+    matches = [
+        (city, region, coords)
+        for regions in LOCATIONS.values()
+        for region, cities in regions.items()
+        for city, coords in cities.items()
+        if _normalize(city) == _normalize(parts[0])
+        and (len(parts) == 1 or _normalize(region) == _normalize(parts[1]))
+    ]
+    if not matches:
+        raise ValueError(f"Unknown location: {name}")
+    if len(matches) > 1:
+        options = "; ".join(f"{city}, {region}" for city, region, _ in matches)
+        raise ValueError(f"Ambiguous location {name}, use one of: {options}")
+    return matches[0][2]
+
+def find_activity(name):
+    """ACTIVITY_PROFILES key for a profile name, matched with or without its icon"""
+    for key, profile in ACTIVITY_PROFILES.items():
+        label = key.replace(profile['icon'], "")
+        if _normalize(name) in (_normalize(key), _normalize(label)):
+            return key
+    raise ValueError(f"Unknown activity: {name}")
@@ -0,0 +1,189 @@
+"""Weather risk scoring against activity thresholds"""
+import numpy as np
+import pandas as pd
+
+RISK_CATEGORIES = ['too_cold', 'too_hot', 'rainy', 'windy']
+MIN_WINDOW_DAYS = 10  # Fewer matching days than this is not enough to score
+
+def filter_target_window(df, target_month, target_day):
+    """Days within ±3 days of the target date in the same month"""
+    return df[(df['month'] == target_month) & (abs(df['day'] - target_day) <= 3)].copy()
+
+def threshold_masks(df_filtered, thresholds):
+    """Boolean day masks per risk category, shared by per-category and overall risk"""
+    return {
+        'too_cold': (df_filtered['temp_min'] < thresholds['temp_min']).to_numpy(),
+        'too_hot': (df_filtered['temp_max'] > thresholds['temp_max']).to_numpy(),
+        'rainy': (df_filtered['precipitation'] >= thresholds['rain']).to_numpy(),
+        'windy': (df_filtered['wind_speed'] >= thresholds['wind']).to_numpy()
+    }
+
+def comfort_risks(df_filtered):
+    """Humidity and heat index risks, which do not depend on the activity thresholds"""
+    total_days = len(df_filtered)
+    risks = {}
+
+    # Add humidity risk if available
+    if 'humidity' in df_filtered.columns and df_filtered['humidity'].notna().sum() > 10:
+        risks['high_humidity'] = (df_filtered['humidity'] > 80).sum() / total_days * 100
+
+    # Add uncomfortable heat index risk
+    if 'heat_index' in df_filtered.columns and df_filtered['heat_index'].notna().sum() > 10:
+        risks['uncomfortable_heat'] = (df_filtered['heat_index'] > 35).sum() / total_days * 100
+
+    return risks
+
+def calculate_enhanced_weather_risks(df, target_month, target_day, thresholds):
+    """Enhanced risk calculation including humidity and heat index"""
+    df_filtered = filter_target_window(df, target_month, target_day)
+
+    if len(df_filtered) < MIN_WINDOW_DAYS:
+        return None
+
+    total_days = len(df_filtered)
+    masks = threshold_masks(df_filtered, thresholds)
+
+    risks = {category: mask.sum() / total_days * 100 for category, mask in masks.items()}
+    risks.update(comfort_risks(df_filtered))
+
+    bad_weather_days = np.logical_or.reduce(list(masks.values())).sum()
+    overall_risk = (bad_weather_days / total_days) * 100
+
+    stats = {
+        'avg_temp': df_filtered['temperature'].mean(),
+        'typical_high': df_filtered['temp_max'].median(),
+        'typical_low': df_filtered['temp_min'].median(),
+        'max_temp_ever': df_filtered['temp_max'].max(),
+        'min_temp_ever': df_filtered['temp_min'].min(),
+        'avg_precip': df_filtered['precipitation'].mean(),
+        'max_precip_ever': df_filtered['precipitation'].max(),
+        'avg_wind': df_filtered['wind_speed'].mean(),
+        'max_wind_ever': df_filtered['wind_speed'].max(),
+        'rainy_days': (df_filtered['precipitation'] >= 1.0).sum(),
+        'total_days': total_days,
+        'years_analyzed': df_filtered['year'].nunique(),
+        'avg_humidity': df_filtered['humidity'].mean() if 'humidity' in df_filtered.columns else None,
+        'avg_cloud_cover': df_filtered['cloud_cover'].mean() if 'cloud_cover' in df_filtered.columns else None
+    }
+
+    return risks, overall_risk, stats, df_filtered
+
+def calculate_confidence_score(stats):
+    """Confidence label and color from how much history backs the result"""
+    years = stats['years_analyzed']
+    days = stats['total_days']
+
+    if years >= 10 and days >= 50:
+        return "HIGH ✅", "#00ff64"
+    elif years >= 5 and days >= 25:
+        return "MEDIUM ⚠", "#ffa500"
+    else:
+        return "LOW ❌", "#ff0080"
+
+def score_profiles(df_filtered, profiles):
+    """Score every activity profile against an already filtered window in one pass
+
+    `profiles` maps a name to either a profile dict with a 'thresholds' key
+    (as in ACTIVITY_PROFILES) or a bare thresholds dict. Returns a
+    profiles x risk-category DataFrame of percentages with an 'overall_risk'
+    column, sorted from lowest to highest overall risk.
+    """
+    names = list(profiles)
+    thresholds = [profiles[name].get('thresholds', profiles[name]) for name in names]
+    total_days = len(df_filtered)
+    if not names or total_days == 0:
+        return pd.DataFrame(columns=RISK_CATEGORIES + ['overall_risk'])
+
+    def column(key):
+        return np.array([t[key] for t in thresholds], dtype=float)[:, None]
+
+    # (profiles x days) masks, each day column compared once against every profile
+    masks = {
+        'too_cold': df_filtered['temp_min'].to_numpy()[None, :] < column('temp_min'),
+        'too_hot': df_filtered['temp_max'].to_numpy()[None, :] > column('temp_max'),
+        'rainy': df_filtered['precipitation'].to_numpy()[None, :] >= column('rain'),
+        'windy': df_filtered['wind_speed'].to_numpy()[None, :] >= column('wind')
+    }
+
+    matrix = pd.DataFrame({category: mask.sum(axis=1) / total_days * 100 for category, mask in masks.items()},
+                          index=pd.Index(names, name='profile'))
+    for category, value in comfort_risks(df_filtered).items():
+        matrix[category] = value
+    matrix['overall_risk'] = np.logical_or.reduce(list(masks.values())).sum(axis=1) / total_days * 100
+    return matrix.sort_values('overall_risk', kind='stable')
+
+def daily_risk_calendar(history, thresholds, years=None):
+    """Risk for every (month, day) target date from one pass over a location history
+
+    Each target date's window is the same-month days within ±3 days across all
+    years, exactly as in filter_target_window. Bad-day counts are binned by
+    (month, day) once and every window is a 7-day sliding sum over those bins.
+    Returns a DataFrame indexed by (month, day) with the RISK_CATEGORIES,
+    'overall_risk' and 'total_days'.
+    """
+    if years is not None:
+        history = history[history['date'].dt.year.isin(years)]
+
+    masks = threshold_masks(history, thresholds)
+    masks['overall_risk'] = np.logical_or.reduce(list(masks.values()))
+    masks['total_days'] = np.ones(len(history), dtype=bool)
+
+    # (category, month, day) bins, padded by 3 days either side of each month
+    months = history['month'].to_numpy() - 1
+    days = history['day'].to_numpy() - 1 + 3
+    bins = np.zeros((len(masks), 12, 31 + 6))
+    for idx, mask in enumerate(masks.values()):
+        np.add.at(bins[idx], (months[mask], days[mask]), 1)
+
+    sums = np.lib.stride_tricks.sliding_window_view(bins, 7, axis=2).sum(axis=3)
+
+    index = pd.MultiIndex.from_product([range(1, 13), range(1, 32)], names=['month', 'day'])
+    calendar = pd.DataFrame(sums.reshape(len(masks), -1).T, index=index, columns=list(masks))
+    totals = calendar['total_days'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for category in RISK_CATEGORIES + ['overall_risk']:
+            calendar[category] = np.where(totals > 0, calendar[category] / totals * 100, np.nan)
+    calendar['total_days'] = totals.astype(int)
+    return calendar
+
+def rank_dates(calendar, start_date, end_date):
+    """Rank every date in a range by overall risk from a (month, day) risk calendar
+
+    Dates with fewer than MIN_WINDOW_DAYS historical days are left out, the
+    same cut-off calculate_enhanced_weather_risks applies.
+    """
+    dates = pd.date_range(start_date, end_date, freq='D')
+    ranked = calendar.reindex(pd.MultiIndex.from_arrays([dates.month, dates.day])).reset_index(drop=True)
+    ranked.insert(0, 'date', dates)
+    ranked = ranked[ranked['total_days'] >= MIN_WINDOW_DAYS]
+    return ranked.sort_values(['overall_risk', 'date'], kind='stable').reset_index(drop=True)
+
+def find_best_dates(history, thresholds, start_date, end_date, years=None):
+    """Rank every date in a range by overall risk, using one cached location history"""
+    return rank_dates(daily_risk_calendar(history, thresholds, years), start_date, end_date)
+
+def compare_locations(windows, target_month, target_day, thresholds):
+    """Score several locations for the same date and thresholds, lowest risk first
+
+    `windows` maps a location name to its date-window frame (as returned by
+    extract_date_windows). Locations with too little data are left out.
+    """
+    rows = []
+    for name, df in windows.items():
+        result = calculate_enhanced_weather_risks(df, target_month, target_day, thresholds) if not df.empty else None
+        if result is None:
+            continue
+        risks, overall_risk, stats, _ = result
+        rows.append({
+            'location': name,
+            'overall_risk': overall_risk,
+            **{category: risks[category] for category in RISK_CATEGORIES},
+            'typical_high': stats['typical_high'],
+            'typical_low': stats['typical_low'],
+            'years_analyzed': stats['years_analyzed'],
+            'total_days': stats['total_days']
+        })
+
+    columns = ['location', 'overall_risk'] + RISK_CATEGORIES + ['typical_high', 'typical_low',
+                                                                'years_analyzed', 'total_days']
+    return pd.DataFrame(rows, columns=columns).sort_values('overall_risk', kind='stable').reset_index(drop=True)
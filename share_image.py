@@ -0,0 +1,99 @@
+"""Shareable report card rendered straight to PNG with Pillow, no kaleido or headless browser
+
+Draws the location, date, activity, overall risk, temperature range, rain
+and wind risk, plus the risk gauge and per-category bars in the same colours
+as the app's charts. A render takes tens of milliseconds. Pillow is imported
+on the first render, not when the app starts.
+"""
+import io
+from functools import lru_cache
+
+SHARE_IMAGE_SIZE = (1200, 900)
+BACKGROUND = "#05070d"
+CYAN, GREEN, ORANGE, PINK, WHITE, GREY = "#00d4ff", "#00ff64", "#ffa500", "#ff0080", "#ffffff", "#1d2533"
+# Same bands and colours as charts.create_risk_gauge
+GAUGE_BANDS = [(20, GREEN, "MISSION GO"), (40, CYAN, "NOMINAL"), (60, ORANGE, "CAUTION"), (100, PINK, "HIGH RISK")]
+BREAKDOWN_BARS = [('too_cold', "COLD", CYAN), ('too_hot', "HEAT", PINK), ('rainy', "RAIN", GREEN),
+                  ('windy', "WIND", ORANGE)]
+FONT_CANDIDATES = {
+    False: ["DejaVuSans.ttf", "LiberationSans-Regular.ttf", "Arial.ttf", "arial.ttf"],
+    True: ["DejaVuSans-Bold.ttf", "LiberationSans-Bold.ttf", "Arial Bold.ttf", "arialbd.ttf"],
+}
+
+@lru_cache(maxsize=None)
+def _font(size, bold=False):
+    """First installed system font, else Pillow's bundled scalable font"""
+    from PIL import ImageFont
+
+    for name in FONT_CANDIDATES[bold]:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+def _plain(text):
+    """Drop emoji and pictographs, which the fallback fonts cannot draw"""
+    return " ".join("".join(ch for ch in str(text) if ord(ch) < 0x2190).split())
+
+def _gauge_band(overall_risk):
+    for limit, color, status in GAUGE_BANDS:
+        if overall_risk < limit:
+            return color, status
+    return GAUGE_BANDS[-1][1:]
+
+def _centered(draw, y, text, size, color, bold=False):
+    draw.text((SHARE_IMAGE_SIZE[0] // 2, y), _plain(text), font=_font(size, bold), fill=color, anchor="mt")
+
+def _draw_gauge(draw, center, radius, overall_risk):
+    color, status = _gauge_band(overall_risk)
+    box = [center[0] - radius, center[1] - radius, center[0] + radius, center[1] + radius]
+    draw.arc(box, 180, 360, fill=GREY, width=28)
+    value = min(max(overall_risk, 0), 100)
+    if value > 0:
+        draw.arc(box, 180, 180 + 180 * value / 100, fill=color, width=28)
+    draw.text((center[0], center[1] - 20), f"{overall_risk:.1f}%", font=_font(56, True), fill=color, anchor="ms")
+    draw.text((center[0], center[1] + 20), status, font=_font(24, True), fill=color, anchor="mt")
+
+def _draw_breakdown(draw, left, top, width, risks):
+    label_width, bar_height, gap = 90, 30, 22
+    bar_width = width - label_width - 90
+    for idx, (key, label, color) in enumerate(BREAKDOWN_BARS):
+        y = top + idx * (bar_height + gap)
+        value = min(max(float(risks.get(key, 0) or 0), 0), 100)
+        draw.text((left, y + bar_height // 2), label, font=_font(20, True), fill=WHITE, anchor="lm")
+        x0 = left + label_width
+        draw.rectangle([x0, y, x0 + bar_width, y + bar_height], fill=GREY)
+        if value > 0:
+            draw.rectangle([x0, y, x0 + bar_width * value / 100, y + bar_height], fill=color)
+        draw.text((x0 + bar_width + 12, y + bar_height // 2), f"{value:.1f}%", font=_font(20), fill=WHITE,
+                  anchor="lm")
+
+def render_share_image(location_name, target_date, selected_activity, overall_risk, stats, risks):
+    """PNG bytes of the report card for an analysis"""
+    from PIL import Image, ImageDraw
+
+    width, height = SHARE_IMAGE_SIZE
+    image = Image.new("RGB", SHARE_IMAGE_SIZE, BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([12, 12, width - 13, height - 13], outline=CYAN, width=2)
+
+    _centered(draw, 40, "PARADE GUARDS: Weather Intelligence Report", 36, CYAN, bold=True)
+    _centered(draw, 105, f"LOCATION: {location_name}", 26, CYAN)
+    _centered(draw, 145, f"DATE: {target_date.strftime('%B %d, %Y')}", 24, WHITE)
+    _centered(draw, 185, f"ACTIVITY: {selected_activity}", 24, GREEN)
+
+    _draw_gauge(draw, (310, 470), 190, overall_risk)
+    _draw_breakdown(draw, 640, 300, 500, risks)
+
+    _centered(draw, 580, f"RISK ASSESSMENT: {overall_risk:.1f}%", 30, PINK, bold=True)
+    _centered(draw, 635, f"TEMPERATURE: {stats['typical_low']:.1f}°C to {stats['typical_high']:.1f}°C", 22, CYAN)
+    _centered(draw, 670, f"RAIN RISK: {risks['rainy']:.1f}% | WIND RISK: {risks['windy']:.1f}%", 22, CYAN)
+    _centered(draw, 715, f"DATA: {stats['years_analyzed']} years analyzed ({stats['total_days']} days)", 20, WHITE)
+
+    _centered(draw, 805, "Generated by Parade Guards Weather Intelligence System", 20, WHITE)
+    _centered(draw, 840, "Data Source: NASA POWER API | Weather Protection Active", 18, CYAN)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=False, compress_level=3)
+    return buffer.getvalue()
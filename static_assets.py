@@ -0,0 +1,70 @@
+"""Small web copies of the app's images, built once instead of base64-inlining the originals every rerun
+
+Usage: python static_assets.py  (rebuilds static/ after 2.png changes, commit the result)
+
+2.png is a 3200 x 3200 PNG (1.4 MB) shown at 100 px in the header. The
+header asset is a 240 px WebP (a few KB, sharp on 2x screens) committed in
+static/. Streamlit serves that folder at app/static/ when
+server.enableStaticServing is on (see .streamlit/config.toml), so the page
+references it by URL. Otherwise the same few KB are inlined as a data URI,
+which is encoded once per process. The app never rebuilds the asset itself,
+so startup does not depend on file mtimes or import Pillow.
+"""
+import base64
+import io
+import os
+from functools import lru_cache
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(APP_DIR, "static")
+STATIC_URL = "app/static"  # Where Streamlit serves STATIC_DIR
+LOGO_SOURCE = os.path.join(APP_DIR, "2.png")
+LOGO_ASSET = "logo.webp"
+LOGO_PATH = os.path.join(STATIC_DIR, LOGO_ASSET)
+LOGO_SIZE = 240  # Pixels, 2x the largest size the header displays it at
+WEBP_QUALITY = 85
+
+def _encode_logo(source=LOGO_SOURCE, size=LOGO_SIZE):
+    from PIL import Image
+
+    with Image.open(source) as image:
+        image.thumbnail((size, size), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=6)
+    return buffer.getvalue()
+
+def build_logo(source=LOGO_SOURCE, static_dir=STATIC_DIR, size=LOGO_SIZE):
+    """Encode the downsized logo from the source image into static_dir, returns its path"""
+    path = os.path.join(static_dir, LOGO_ASSET)
+    data = _encode_logo(source, size)
+    os.makedirs(static_dir, exist_ok=True)
+    # Write then rename so a concurrent reader never sees a half-written file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+@lru_cache(maxsize=None)
+def logo_data_uri():
+    """The downsized logo as a data URI, encoded once per process"""
+    if os.path.exists(LOGO_PATH):
+        with open(LOGO_PATH, "rb") as f:
+            data = f.read()
+    else:
+        # Checkout without the built asset: encode in memory, leave static/ alone
+        data = _encode_logo()
+    return f"data:image/webp;base64,{base64.b64encode(data).decode()}"
+
+@lru_cache(maxsize=None)
+def logo_src(static_serving=False):
+    """<img> src for the header logo: a static URL when Streamlit serves static/, else the small data URI"""
+    if os.path.exists(LOGO_PATH):
+        return f"{STATIC_URL}/{LOGO_ASSET}" if static_serving else logo_data_uri()
+    if not os.path.exists(LOGO_SOURCE):
+        return "2.png"
+    return logo_data_uri()
+
+if __name__ == "__main__":
+    path = build_logo()
+    print(f"{LOGO_SOURCE}: {os.path.getsize(LOGO_SOURCE) / 1024:.0f} KB -> {path}: {os.path.getsize(path) / 1024:.1f} KB")
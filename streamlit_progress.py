@@ -0,0 +1,25 @@
+"""Streamlit progress bar driven by the fetch layer's progress callbacks"""
+from contextlib import contextmanager
+
+import streamlit as st
+
+@contextmanager
+def streamlit_progress(message="📡 Fetching data"):
+    """Yield a `progress_callback(done, total, label)` that drives a progress bar and status line
+
+    The callbacks are only ever invoked from the script thread (the fetch
+    layer calls them as futures complete), which is what Streamlit needs.
+    Both widgets are removed on exit.
+    """
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+
+    def on_progress(done, total, label):
+        status_text.text(f"{message}: {label} ({done}/{total})")
+        progress_bar.progress(done / total)
+
+    try:
+        yield on_progress
+    finally:
+        progress_bar.empty()
+        status_text.empty()